@@ -0,0 +1,117 @@
+'''Reproducible synthetic postcode datasets for benchmarking.
+
+Every generator takes a random.Random, so that the same seed always gives
+the same postcodes, and each kind of input can be timed alone or in a mix.
+'''
+
+import random
+
+from ukpostcodeparser import exceptions, grammar, parser
+
+
+_OUTCODES = sorted(grammar._tables()['outcodes'])
+_INCODES = list(grammar.iter_incodes())
+_BAD_INCODE_CHARS = 'CIKMOV'
+# Not postal zones, nor the start of one followed by a digit
+_BAD_AREAS = ['Q', 'V', 'X', 'QA', 'ZZ']
+
+
+def _outcode(rng):
+    return rng.choice(_OUTCODES)
+
+
+def _case(rng, postcode):
+    return postcode.lower() if rng.random() < 0.3 else postcode
+
+
+def valid(rng):
+    '''A full postcode, in either case, with or without its space.'''
+
+    separator = ' ' if rng.random() < 0.8 else ''
+    return _case(rng, _outcode(rng) + separator + rng.choice(_INCODES))
+
+
+def invalid(rng):
+    '''Something the right shape and length, but not a postcode.'''
+
+    kind = rng.randrange(3)
+    if kind == 0:
+        outcode = rng.choice(_BAD_AREAS) + str(rng.randrange(10))
+        incode = rng.choice(_INCODES)
+    elif kind == 1:
+        outcode = _outcode(rng)
+        incode = str(rng.randrange(10)) + rng.choice(_BAD_INCODE_CHARS) * 2
+    else:
+        # Random characters are now and then a postcode, so try again
+        while True:
+            postcode = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+                               for _ in range(rng.randint(5, 7)))
+            if _is_rejected(postcode):
+                return postcode
+    postcode = _case(rng, outcode + ' ' + incode)
+    assert _is_rejected(postcode), postcode
+    return postcode
+
+
+def _is_rejected(postcode):
+    return parser._parse(postcode, True, True)[2] is exceptions.InvalidPostcodeError
+
+
+def outcode_only(rng):
+    '''An outcode on its own.'''
+
+    return _case(rng, _outcode(rng))
+
+
+def over_length(rng):
+    '''Too long to be a postcode, from just over to a whole address.'''
+
+    if rng.random() < 0.7:
+        return valid(rng) + rng.choice(['X', '1', 'ABC', ' UK'])
+    return '{} High Street, Anytown, {}'.format(rng.randrange(1, 200), valid(rng))
+
+
+def messy_whitespace(rng):
+    '''A full postcode padded or split with assorted whitespace.'''
+
+    postcode = valid(rng).replace(' ', '')
+    split = len(postcode) - 3
+    middle = rng.choice([' ', '  ', '\t', ' ', ''])
+    return (rng.choice(['', ' ', '  ', '\t']) + postcode[:split] + middle +
+            postcode[split:] + rng.choice(['', ' ', '\n', '\r\n']))
+
+
+GENERATORS = {
+    'valid': valid,
+    'invalid': invalid,
+    'outcode_only': outcode_only,
+    'over_length': over_length,
+    'messy_whitespace': messy_whitespace,
+}
+
+# Proportions of each kind of input
+MIXES = {
+    'realistic': {'valid': 0.85, 'messy_whitespace': 0.06, 'invalid': 0.05,
+                  'outcode_only': 0.03, 'over_length': 0.01},
+    'dirty': {'valid': 0.4, 'messy_whitespace': 0.2, 'invalid': 0.2,
+              'outcode_only': 0.1, 'over_length': 0.1},
+}
+MIXES.update((name, {name: 1.0}) for name in GENERATORS)
+
+
+def generate(mix='realistic', size=100000, seed=0):
+    '''Return a list of size postcodes, in the proportions of a named mix.'''
+
+    proportions = MIXES[mix]
+    names = sorted(proportions)
+    weights = [proportions[name] for name in names]
+    rng = random.Random(seed)
+    return [GENERATORS[name](rng)
+            for name in rng.choices(names, weights, k=size)]
+
+
+def normalised(postcodes):
+    '''The postcodes as the strict matcher sees them, skipping any too long.'''
+
+    results = (parser.normalise_postcode(postcode) for postcode in postcodes)
+    return [postcode for postcode in results if postcode is not None]
@@ -0,0 +1,33 @@
+'''Compare the strict state machine with the regexs it replaced.
+
+Usage:              python -m benchmarks.engines
+'''
+
+import timeit
+
+from ukpostcodeparser.parser import match_strict, _match_strict_regex
+
+
+SAMPLES = {
+    'full': ['CR02YR', 'SW1A1AA', 'N168QS', 'EC1A1BB', 'BF11AA'],
+    'outcode': ['CR0', 'SW1A', 'N16', 'EC1A', 'BF1'],
+    'invalid': ['XX02YR', 'QQ', 'NPT0DT', 'W1M4ZZ9', '1234567'],
+}
+
+
+def main(number=200000):
+    for name, samples in sorted(SAMPLES.items()):
+        timings = []
+        for engine in (_match_strict_regex, match_strict):
+            def run():
+                for postcode in samples:
+                    engine(postcode)
+            seconds = min(timeit.repeat(run, number=number // len(samples), repeat=3))
+            timings.append(seconds / number * 1e9)
+        print('{:8} regex {:7.1f} ns  state machine {:7.1f} ns  speedup {:.2f}x'.format(
+            name, timings[0], timings[1], timings[0] / timings[1]
+        ))
+
+
+if __name__ == '__main__':
+    main()
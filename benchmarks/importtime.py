@@ -0,0 +1,81 @@
+'''Measure the cost of importing ukpostcodeparser, and of first using it.
+
+Each measurement is taken in a fresh interpreter, as a process starting
+cold would see it, and the median of several is checked against a budget.
+The first use of the codec, which needs the grammar's tables, is measured
+too, both enumerating them and loading them through UKPOSTCODEPARSER_TABLES
+from a file written by grammar.dump_tables.
+
+Usage:              python -m benchmarks.importtime [runs]
+'''
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from ukpostcodeparser import grammar
+
+
+# Median milliseconds allowed, on the slowest machine this is run on
+IMPORT_BUDGET_MS = 15.0
+FIRST_PARSE_BUDGET_MS = 1.0
+FIRST_ENCODE_BUDGET_MS = 50.0
+
+# json is imported last, as it would otherwise import re ahead of time
+SCRIPT = '''
+import time
+start = time.perf_counter()
+import ukpostcodeparser
+imported = time.perf_counter()
+ukpostcodeparser.parse_uk_postcode('cr0 2yr')
+parsed = time.perf_counter()
+from ukpostcodeparser import codec
+codec.encode_postcode('cr0 2yr')
+encoded = time.perf_counter()
+import json
+print(json.dumps([(imported - start) * 1e3, (parsed - imported) * 1e3,
+                  (encoded - parsed) * 1e3]))
+'''
+
+
+def measure(runs, environment=None):
+    '''Return the median import, first parse and first encode milliseconds
+    over runs.'''
+
+    env = dict(os.environ, **(environment or {}))
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT], env=env)
+        timings.append(json.loads(output))
+    return [statistics.median(timing) for timing in zip(*timings)]
+
+
+def main(runs=15):
+    handle, path = tempfile.mkstemp()
+    os.close(handle)
+    try:
+        grammar.dump_tables(path)
+        built = measure(runs)
+        loaded = measure(runs, {grammar.TABLES_ENVIRONMENT_VARIABLE: path})
+    finally:
+        os.remove(path)
+
+    over = False
+    for name, value, budget in [('import', built[0], IMPORT_BUDGET_MS),
+                                ('first parse', built[1], FIRST_PARSE_BUDGET_MS),
+                                ('first encode', built[2], FIRST_ENCODE_BUDGET_MS),
+                                ('first encode, loaded tables', loaded[2],
+                                 FIRST_ENCODE_BUDGET_MS)]:
+        flag = ''
+        if value > budget:
+            flag = '  OVER BUDGET'
+            over = True
+        print('{:28} {:6.1f} ms  (budget {:.1f} ms){}'.format(name, value, budget, flag))
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*[int(arg) for arg in sys.argv[1:]]))
@@ -0,0 +1,37 @@
+'''Compare normalise_postcode with the replace() and upper() it replaced.
+
+Usage:              python -m benchmarks.normalise
+'''
+
+import timeit
+
+from ukpostcodeparser.parser import normalise_postcode
+
+
+SAMPLES = {
+    'clean': 'cr0 2yr',
+    'tabs': 'cr0\t2yr ',
+    'garbage': 'x' * 10240,
+}
+
+
+def replace_upper(postcode):
+    postcode = postcode.replace(' ', '').upper()
+    if len(postcode) > 7:
+        return None
+    return postcode
+
+
+def main(number=200000):
+    for name, sample in sorted(SAMPLES.items()):
+        timings = []
+        for normalise in (replace_upper, normalise_postcode):
+            seconds = min(timeit.repeat(lambda: normalise(sample), number=number, repeat=3))
+            timings.append(seconds / number * 1e9)
+        print('{:8} replace/upper {:8.1f} ns  normalise_postcode {:8.1f} ns'.format(
+            name, timings[0], timings[1]
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+'''Measure parse_uk_postcodes with a process pool across chunk sizes.
+
+Shows where the chunk size gets large enough that passing data between
+processes stops dominating. Scaling with workers can only be seen on a
+machine with as many cores as workers.
+
+Usage:              python -m benchmarks.parallel [workers]
+'''
+
+import multiprocessing
+import sys
+import time
+
+from ukpostcodeparser.parser import parse_uk_postcodes
+
+
+POSTCODES = ['cr0 2yr', 'SW1A 1AA', 'xx0 2yr', 'n16', 'EC1A 1BB'] * 100000
+CHUNKSIZES = [10, 100, 1000, 10000, 50000]
+
+
+def rate(**kwargs):
+    start = time.perf_counter()
+    for _ in parse_uk_postcodes(POSTCODES, **kwargs):
+        pass
+    return len(POSTCODES) / (time.perf_counter() - start)
+
+
+def main(workers=None):
+    workers = workers or multiprocessing.cpu_count()
+    serial = rate()
+    print('{} postcodes, {} workers, {} cores'.format(
+        len(POSTCODES), workers, multiprocessing.cpu_count()
+    ))
+    print('serial            {:10.0f} postcodes/s'.format(serial))
+    for chunksize in CHUNKSIZES:
+        parallel = rate(workers=workers, chunksize=chunksize)
+        print('chunksize {:6}  {:10.0f} postcodes/s  {:.2f}x serial'.format(
+            chunksize, parallel, parallel / serial
+        ))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
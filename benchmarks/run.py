@@ -0,0 +1,196 @@
+'''Time every parse path on the same reproducible dataset.
+
+Reports, for each path, postcodes parsed per second, the latency of a call
+(or, for batch paths, of each postcode within a batch) at the 50th, 90th
+and 99th percentiles, and the memory allocated while parsing.
+
+Results can be saved, and later compared against, to catch regressions:
+
+    python -m benchmarks.run --save before.json
+    python -m benchmarks.run --compare before.json
+
+Usage:              python -m benchmarks.run [--mix MIX] [--size N] [--seed N]
+                                             [--only TEXT] [--repeat N]
+                                             [--save FILE] [--compare FILE]
+'''
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from itertools import product
+
+from benchmarks import datasets
+from ukpostcodeparser import exceptions
+from ukpostcodeparser.cache import CachedPostcodeParser
+from ukpostcodeparser.parser import (
+    parse_uk_postcode, parse_uk_postcodes, match_strict, _match_strict_regex
+)
+
+
+BATCH_SIZE = 1000
+PERCENTILES = [50, 90, 99]
+
+
+def _scalar(function):
+    '''Return a callable running function on one postcode, as callers do.'''
+
+    def run(postcode):
+        try:
+            function(postcode)
+        except exceptions.InvalidPostcodeError:
+            pass
+    return run
+
+
+def _batch(function):
+    def run(postcodes):
+        for _ in function(postcodes):
+            pass
+    return run
+
+
+def cases(postcodes):
+    '''Return (name, run, units, batch size) for each path to be timed.
+
+    run is called once for each of units.
+    '''
+
+    batches = [postcodes[start:start + BATCH_SIZE]
+               for start in range(0, len(postcodes), BATCH_SIZE)]
+    found = []
+
+    for strict, incode_mandatory in product([True, False], repeat=2):
+        name = 'parse_uk_postcode strict={} incode_mandatory={}'.format(
+            strict, incode_mandatory
+        )
+        run = _scalar(lambda postcode, strict=strict, incode_mandatory=incode_mandatory:
+                      parse_uk_postcode(postcode, strict, incode_mandatory))
+        found.append((name, run, postcodes, 1))
+
+    found.append(('parse_uk_postcodes', _batch(parse_uk_postcodes), batches, BATCH_SIZE))
+    found.append(('parse_uk_postcodes intern=True',
+                  _batch(lambda batch: parse_uk_postcodes(batch, intern=True)),
+                  batches, BATCH_SIZE))
+
+    # A fresh cache each time, so that every run starts cold
+    def cached(batch):
+        parse = CachedPostcodeParser().parse
+        for postcode in batch:
+            parse(postcode)
+    found.append(('CachedPostcodeParser.parse', cached, batches, BATCH_SIZE))
+
+    try:
+        import numpy
+    except ImportError:
+        pass
+    else:
+        from ukpostcodeparser.vectorized import parse_array
+        arrays = [numpy.array(batch, dtype=object) for batch in batches]
+        found.append(('vectorized.parse_array', parse_array, arrays, BATCH_SIZE))
+
+    # The strict matching engines alone, on normalised input
+    normalised = datasets.normalised(postcodes)
+    found.append(('match_strict', match_strict, normalised, 1))
+    found.append(('_match_strict_regex', _match_strict_regex, normalised, 1))
+    return found
+
+
+def measure(run, units, batch_size, repeat):
+    '''Time run over units, returning a dict of results.'''
+
+    clock = time.perf_counter
+    # Throughput is timed over the whole run, without a clock call between
+    # units to disturb it
+    best = None
+    for _ in range(repeat):
+        start = clock()
+        for unit in units:
+            run(unit)
+        elapsed = clock() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    latencies = []
+    for unit in units:
+        start = clock()
+        run(unit)
+        latencies.append(clock() - start)
+
+    count = len(units) * batch_size
+    per_postcode = sorted(latency / batch_size for latency in latencies)
+    result = {'ops_per_second': count / best}
+    for percentile in PERCENTILES:
+        index = min(len(per_postcode) - 1, len(per_postcode) * percentile // 100)
+        result['p{}_ns'.format(percentile)] = per_postcode[index] * 1e9
+
+    # Allocations are measured on a separate pass, as tracing slows it down
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for unit in units:
+            run(unit)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result['peak_kib'] = (peak - before) / 1024.0
+    result['retained_bytes_per_op'] = (current - before) / float(count)
+    return result
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument('--mix', default='realistic', choices=sorted(datasets.MIXES))
+    arguments.add_argument('--size', type=int, default=100000)
+    arguments.add_argument('--seed', type=int, default=0)
+    arguments.add_argument('--only', help='Only time paths whose name contains this')
+    arguments.add_argument('--repeat', type=int, default=3)
+    arguments.add_argument('--save', help='Write the results to this JSON file')
+    arguments.add_argument('--compare', help='Compare with results saved earlier')
+    arguments.add_argument('--tolerance', type=float, default=0.1,
+                           help='Slow down, as a fraction, counted as a regression')
+    options = arguments.parse_args(argv)
+
+    postcodes = datasets.generate(options.mix, options.size, options.seed)
+    print('{} postcodes, mix {}, seed {}'.format(len(postcodes), options.mix, options.seed))
+    print('{:50} {:>11} {:>9} {:>9} {:>9} {:>10} {:>10}'.format(
+        'path', 'ops/s', 'p50 ns', 'p90 ns', 'p99 ns', 'peak KiB', 'kept B/op'
+    ))
+
+    results = {}
+    for name, run, units, batch_size in cases(postcodes):
+        if options.only and options.only not in name:
+            continue
+        result = results[name] = measure(run, units, batch_size, options.repeat)
+        print('{:50} {ops_per_second:11.0f} {p50_ns:9.0f} {p90_ns:9.0f} {p99_ns:9.0f} '
+              '{peak_kib:10.1f} {retained_bytes_per_op:10.1f}'.format(name, **result))
+
+    saved = {'mix': options.mix, 'size': options.size, 'seed': options.seed,
+             'results': results}
+    if options.save:
+        with open(options.save, 'w') as stream:
+            json.dump(saved, stream, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as stream:
+            baseline = json.load(stream)
+        if [baseline[key] for key in ('mix', 'size', 'seed')] != \
+                [saved[key] for key in ('mix', 'size', 'seed')]:
+            print('Warning: baseline was run on a different dataset')
+        regressions = 0
+        for name, result in sorted(results.items()):
+            if name not in baseline['results']:
+                continue
+            ratio = result['ops_per_second'] / baseline['results'][name]['ops_per_second']
+            flag = ''
+            if ratio < 1 - options.tolerance:
+                flag = '  REGRESSION'
+                regressions += 1
+            print('{:50} {:6.2f}x baseline{}'.format(name, ratio, flag))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
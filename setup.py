@@ -9,4 +9,11 @@ setup(
     url='https://github.com/hamstah/ukpostcodeparser',
     description='UK Postcode parser',
     license='MIT',
+    python_requires='>=3.7',
+    extras_require={
+        'numpy': ['numpy'],
+        'pandas': ['pandas'],
+        'arrow': ['numpy', 'pyarrow'],
+        'prometheus': ['prometheus_client'],
+    },
 )
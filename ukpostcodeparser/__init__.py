@@ -1,3 +1,4 @@
 from __future__ import absolute_import
 
-from .parser import parse_uk_postcode
+from .parser import parse_uk_postcode, parse_uk_postcodes
+from .result import Postcode, ResultCode
@@ -0,0 +1,6 @@
+import sys
+
+from ukpostcodeparser.cli import main
+
+
+sys.exit(main())
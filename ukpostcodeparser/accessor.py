@@ -0,0 +1,98 @@
+'''pandas Series accessor for UK postcodes
+
+Importing this module registers a ukpostcode accessor on pandas Series,
+backed by the vectorised parser rather than Series.apply.
+
+Usage example:      >>> import ukpostcodeparser.accessor
+                    >>> postcodes = pandas.Series(['cr0 2yr', 'sw1a 1aa', 'xx0'])
+                    >>> postcodes.ukpostcode.outcode.tolist()
+                    ['CR0', 'SW1A', nan]
+                    >>> postcodes.ukpostcode.area.tolist()
+                    ['CR', 'SW', nan]
+'''
+
+import pandas
+
+from ukpostcodeparser import vectorized
+
+
+@pandas.api.extensions.register_series_accessor('ukpostcode')
+class PostcodeAccessor(object):
+    '''Parse a Series of postcodes in bulk.
+
+    The properties use the same defaults as parse_uk_postcode - strict, with
+    the incode mandatory - and hold NaN wherever it would have raised. Use
+    parse() for other settings.
+
+    Each property parses the whole Series again, so nothing is kept with
+    it. To read several, call parse() once and keep the DataFrame.
+    '''
+
+    def __init__(self, series):
+        self._series = series
+
+    def parse(self, strict=True, incode_mandatory=True):
+        '''Split the postcodes into outcode and incode portions.
+
+        Arguments:
+        strict              As for parse_uk_postcode.
+        incode_mandatory    As for parse_uk_postcode.
+
+        Returns:            A DataFrame with the same index as the Series and
+                            columns outcode, incode, area and valid. Outcode,
+                            incode and area are NaN where valid is false.
+        '''
+
+        series = self._series
+        if pandas.api.types.is_string_dtype(series.dtype) and \
+                not pandas.api.types.is_object_dtype(series.dtype) and \
+                series.str.len().max() <= vectorized.MAX_WIDTH:
+            # Skip the per value type checks needed for object columns. Any
+            # longer value would widen every row of the array.
+            values = series.fillna('').to_numpy(dtype='U')
+        else:
+            values = series.to_numpy(dtype=object, na_value=None)
+        parsed = vectorized.parse_array(values, strict, incode_mandatory)
+        outcodes, incodes = vectorized.split_array(parsed)
+        valid = parsed.valid & series.notna().to_numpy()
+
+        index = series.index
+        return pandas.DataFrame({
+            'outcode': pandas.Series(outcodes, index=index, dtype=object).where(valid),
+            'incode': pandas.Series(incodes, index=index, dtype=object).where(valid),
+            'area': pandas.Series(_areas(outcodes), index=index, dtype=object).where(valid),
+            'valid': pandas.Series(valid, index=index),
+        })
+
+    @property
+    def outcode(self):
+        '''The outcode of each postcode, e.g. 'CR0'.'''
+        return self._column('outcode')
+
+    @property
+    def incode(self):
+        '''The incode of each postcode, e.g. '2YR'.'''
+        return self._column('incode')
+
+    @property
+    def area(self):
+        '''The postcode area - the letters starting the outcode, e.g. 'CR'.'''
+        return self._column('area')
+
+    @property
+    def is_valid(self):
+        '''True for each postcode parse_uk_postcode would accept.'''
+        return self._column('valid')
+
+    def _column(self, name):
+        return self.parse()[name].rename(self._series.name)
+
+
+def _areas(outcodes):
+    '''Return the leading letters of each outcode in a string array.'''
+
+    chars = outcodes.view(vectorized.numpy.uint32).reshape(len(outcodes), 4)
+    letters = (chars >= ord('A')) & (chars <= ord('Z'))
+    leading = vectorized.numpy.logical_and.accumulate(letters, axis=1)
+    areas = vectorized.numpy.where(leading, chars, 0)
+    return vectorized.numpy.ascontiguousarray(areas).view('U4')[:, 0]
@@ -0,0 +1,156 @@
+'''asyncio front end for UK postcode parsing
+
+Provides AsyncPostcodeParser, which gathers postcodes awaited concurrently,
+as in a web service handling many requests at once, into batches, and
+parses each batch in a single call rather than one postcode at a time.'''
+
+import asyncio
+
+from ukpostcodeparser import parser
+from ukpostcodeparser.result import Postcode
+
+
+class AsyncPostcodeParser(object):
+    '''Parse postcodes from coroutines, in micro-batches.
+
+    A postcode waits until max_batch_size postcodes are waiting, or for at
+    most max_delay seconds, and is then parsed with the rest of its batch
+    by an executor, keeping the event loop free. Pass a
+    ProcessPoolExecutor to parse on more than one core - that is where the
+    gain lies, as the future each postcode needs costs more than batching
+    saves. On a single core, calling parse_uk_postcode directly is quicker.
+
+    A postcode that raises only fails its own caller, never the rest of
+    its batch.
+
+    Use from a single event loop.
+
+    Usage example:      >>> parse = AsyncPostcodeParser(executor=ProcessPoolExecutor())
+                        >>> async def handler(postcode):
+                        ...     return await parse(postcode)
+                        >>> asyncio.run(handler('cr0 2yr'))
+                        ('CR0', '2YR')
+    '''
+
+    def __init__(self, strict=True, incode_mandatory=True, max_batch_size=1000,
+                 max_delay=0.001, executor=None):
+        '''Arguments:
+        strict              As for parse_uk_postcode, for every postcode.
+        incode_mandatory    As for parse_uk_postcode, for every postcode.
+        max_batch_size      Most postcodes to parse in one batch.
+        max_delay           Longest, in seconds, a postcode waits for others
+                            to join its batch.
+        executor            A concurrent.futures executor to parse batches
+                            in, or None for the event loop's default
+                            executor, a thread pool.
+        '''
+
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self.strict = strict
+        self.incode_mandatory = incode_mandatory
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.executor = executor
+        self._postcodes = []
+        self._futures = []
+        self._timer = None
+        # Batches being parsed by the executor
+        self._running = set()
+
+    async def __call__(self, postcode):
+        '''Split UK postcode into outcode and incode portions.
+
+        As for parse_uk_postcode, which see.
+        '''
+
+        outcode, incode, error = await self.parse(postcode)
+        if error is not None:
+            raise error(*parser.ERROR_MESSAGES[error])
+        return Postcode(outcode, incode)
+
+    def parse(self, postcode):
+        '''Split UK postcode, returning rather than raising any error.
+
+        Returns:            An awaitable of outcode, incode, error - as for
+                            each result of parse_uk_postcodes.
+        '''
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not isinstance(postcode, str):
+            # Refused here, so it cannot fail the batch it would have joined
+            future.set_exception(TypeError(
+                'postcode must be a str, not {}'.format(type(postcode).__name__)
+            ))
+            return future
+        self._postcodes.append(postcode)
+        self._futures.append(future)
+        if len(self._postcodes) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self.flush)
+        return future
+
+    def flush(self):
+        '''Start parsing the postcodes waiting, without waiting any longer.'''
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._postcodes:
+            return
+        postcodes, futures = self._postcodes, self._futures
+        self._postcodes, self._futures = [], []
+
+        batch = asyncio.get_running_loop().run_in_executor(
+            self.executor, parser._parse_chunk,
+            postcodes, self.strict, self.incode_mandatory, None
+        )
+        self._running.add(batch)
+        batch.add_done_callback(lambda batch: self._finish(batch, postcodes, futures))
+
+    def _finish(self, batch, postcodes, futures):
+        self._running.discard(batch)
+        if batch.cancelled():
+            for future in futures:
+                future.cancel()
+        elif batch.exception() is not None:
+            # Find which postcodes raised, so that only their callers fail
+            for postcode, future in zip(postcodes, futures):
+                try:
+                    results = parser._parse_chunk(
+                        [postcode], self.strict, self.incode_mandatory, None
+                    )
+                except Exception as error:
+                    _fail([future], error)
+                else:
+                    _resolve([future], results)
+        else:
+            _resolve(futures, batch.result())
+
+    async def aclose(self):
+        '''Parse the postcodes waiting, and wait for every batch to finish.'''
+
+        self.flush()
+        if self._running:
+            await asyncio.wait(list(self._running))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+def _resolve(futures, results):
+    for future, result in zip(futures, results):
+        # A caller may have given up waiting
+        if not future.done():
+            future.set_result(result)
+
+
+def _fail(futures, error):
+    for future in futures:
+        if not future.done():
+            future.set_exception(error)
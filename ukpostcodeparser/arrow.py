@@ -0,0 +1,148 @@
+'''Apache Arrow and Parquet support for bulk UK postcode parsing
+
+Provides parse_arrow, which parses a pyarrow string array straight from its
+offsets and data buffers with the vectorised parser, without creating a
+Python string per row, and iter_parquet, which does the same for a column
+of a Parquet file a batch at a time.
+
+Usage example:      >>> import pyarrow
+                    >>> from ukpostcodeparser import ResultCode
+                    >>> result = parse_arrow(pyarrow.array(['cr0 2yr', 'cr0', None]))
+                    >>> result.to_pylist()
+                    [{'outcode': 'CR0', 'incode': '2YR', 'status': 0}, {'outcode': '', 'incode': '', 'status': 3}, None]
+                    >>> ResultCode(3).exception
+                    <class 'ukpostcodeparser.exceptions.IncodeNotFoundError'>
+'''
+
+import numpy
+import pyarrow
+
+from ukpostcodeparser import vectorized
+
+
+RESULT_TYPE = pyarrow.struct([
+    ('outcode', pyarrow.string()),
+    ('incode', pyarrow.string()),
+    ('status', pyarrow.int8()),
+])
+
+
+def parse_arrow(array, strict=True, incode_mandatory=True):
+    '''Split a pyarrow array of UK postcodes into outcode and incode.
+
+    Arguments:
+    array               A pyarrow Array or ChunkedArray of strings, or of
+                        anything that casts to strings.
+    strict              As for parse_uk_postcode.
+    incode_mandatory    As for parse_uk_postcode.
+
+    Returns:            A StructArray, or ChunkedArray of them, of RESULT_TYPE.
+                        outcode and incode are as parse_uk_postcode returns,
+                        empty where it would have raised. status is a
+                        ResultCode, whose exception property gives the
+                        exception parse_uk_postcode would have raised. Null
+                        where the input is null.
+    '''
+
+    if isinstance(array, pyarrow.ChunkedArray):
+        return pyarrow.chunked_array(
+            [parse_arrow(chunk, strict, incode_mandatory) for chunk in array.chunks],
+            RESULT_TYPE
+        )
+    if not (pyarrow.types.is_string(array.type) or pyarrow.types.is_large_string(array.type)):
+        array = array.cast(pyarrow.string())
+
+    offsets, data = _buffers(array)
+    starts = offsets[:-1]
+    lengths = offsets[1:] - starts
+    # Rows longer than vectorized.MAX_WIDTH bytes would widen every row of
+    # the batch, so are parsed one at a time
+    long_rows = lengths > vectorized.MAX_WIDTH
+    width = int(lengths[~long_rows].max()) if (~long_rows).any() else 0
+
+    # One column of character codes at a time, so that no temporary is
+    # larger than one index per row
+    codes = numpy.zeros((len(array), max(width, 1)), dtype=numpy.uint8)
+    if len(data):
+        for column in range(width):
+            present = lengths > column
+            indices = numpy.minimum(starts + column, len(data) - 1)
+            codes[:, column] = numpy.where(present, data[indices], 0)
+    # Too long for the batch, so parsed by parser._parse. Setting a non
+    # ASCII code sends them the same way as rows needing decoding.
+    codes[long_rows, 0] = 0x80
+
+    def decode(row):
+        return bytes(data[starts[row]:starts[row] + lengths[row]]).decode('utf-8', 'replace')
+
+    normalised, valid, outcode_end, incode_end, status = vectorized.parse_codes(
+        codes, strict, incode_mandatory, decode
+    )
+    outcodes, incodes = _split(normalised, outcode_end, incode_end)
+    return pyarrow.StructArray.from_arrays(
+        [outcodes, incodes, pyarrow.array(status, pyarrow.int8())],
+        fields=list(RESULT_TYPE),
+        mask=array.is_null() if array.null_count else None,
+    )
+
+
+def iter_parquet(source, column, strict=True, incode_mandatory=True,
+                 batch_size=65536):
+    '''Parse a column of postcodes in a Parquet file, a batch at a time.
+
+    Only the one column is read, and only a batch of it is held in memory
+    at once.
+
+    Arguments:
+    source              A path or file object, as for pyarrow.parquet.ParquetFile.
+    column              The name of the column holding postcodes.
+    batch_size          Rows to read and parse at a time.
+
+    Yields:             A StructArray for each batch, as parse_arrow returns.
+    '''
+
+    import pyarrow.parquet
+
+    parquet_file = pyarrow.parquet.ParquetFile(source)
+    for batch in parquet_file.iter_batches(batch_size, columns=[column]):
+        yield parse_arrow(batch.column(0), strict, incode_mandatory)
+
+
+def _buffers(array):
+    '''Return the offsets and data of a string array as NumPy arrays.'''
+
+    _, offsets_buffer, data_buffer = array.buffers()
+    offset_type = numpy.int64 if pyarrow.types.is_large_string(array.type) else numpy.int32
+    offsets = numpy.frombuffer(offsets_buffer, dtype=offset_type,
+                               count=len(array) + 1, offset=array.offset * offset_type().itemsize)
+    if data_buffer is None:
+        data = numpy.zeros(0, dtype=numpy.uint8)
+    else:
+        data = numpy.frombuffer(data_buffer, dtype=numpy.uint8)
+    return offsets.astype(numpy.int64), data
+
+
+def _split(normalised, outcode_end, incode_end):
+    '''Build outcode and incode string arrays from parse_codes results.'''
+
+    outcode_end = outcode_end.astype(numpy.int64)
+    incode_end = incode_end.astype(numpy.int64)
+    if (normalised >= 128).any():
+        # Non-ASCII digits, which the parser accepts, need encoding
+        outcodes, incodes = vectorized.split_array(vectorized.ParsedArray(
+            normalised.view('U7')[:, 0], None, outcode_end, incode_end, None
+        ))
+        return pyarrow.array(outcodes, pyarrow.string()), pyarrow.array(incodes, pyarrow.string())
+
+    chars = normalised.astype(numpy.uint8)
+    positions = numpy.arange(chars.shape[1])
+    strings = []
+    for start, end in [(0, outcode_end), (outcode_end, incode_end)]:
+        start = numpy.broadcast_to(start, end.shape)
+        mask = (positions >= start[:, None]) & (positions < end[:, None])
+        offsets = numpy.zeros(len(end) + 1, dtype=numpy.int32)
+        numpy.cumsum(end - start, out=offsets[1:])
+        strings.append(pyarrow.StringArray.from_buffers(
+            len(end), pyarrow.py_buffer(offsets), pyarrow.py_buffer(chars[mask].tobytes())
+        ))
+    return strings
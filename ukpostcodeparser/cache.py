@@ -0,0 +1,100 @@
+'''Memoised UK postcode parsing
+
+Provides CachedPostcodeParser, which remembers the result of parsing recently
+seen postcodes. Worthwhile when the same postcodes turn up again and again,
+as they do in most real traffic.'''
+
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+from ukpostcodeparser import exceptions, parser
+from ukpostcodeparser.result import Postcode
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class CachedPostcodeParser(object):
+    '''Drop in replacement for parse_uk_postcode with a bounded LRU cache.
+
+    Results are keyed on the postcode exactly as given, along with the
+    strict and incode_mandatory flags. Failures are cached too, and raised
+    again as the same exception class each time. Values too long to be a
+    postcode are never cached, so junk input cannot fill the cache.
+
+    Safe to share between threads.
+
+    Usage example:      >>> parse = CachedPostcodeParser(maxsize=50000)
+                        >>> parse('cr0 2yr')
+                        ('CR0', '2YR')
+                        >>> parse('cr0 2yr')
+                        ('CR0', '2YR')
+                        >>> parse.cache_info()
+                        CacheInfo(hits=1, misses=1, evictions=0, maxsize=50000, currsize=1)
+    '''
+
+    def __init__(self, maxsize=65536):
+        '''Arguments:
+        maxsize             Most results to keep, or None for no limit.
+        '''
+
+        if maxsize is not None and maxsize < 1:
+            raise ValueError('maxsize must be at least 1, or None')
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._lock = Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def __call__(self, postcode, strict=True, incode_mandatory=True):
+        '''Split UK postcode into outcode and incode portions.
+
+        As for parse_uk_postcode, which see.
+        '''
+
+        outcode, incode, error = self.parse(postcode, strict, incode_mandatory)
+        if error is not None:
+            raise error(*parser.ERROR_MESSAGES[error])
+        return Postcode(outcode, incode)
+
+    def parse(self, postcode, strict=True, incode_mandatory=True):
+        '''Split UK postcode, returning rather than raising any error.
+
+        Returns:            outcode, incode, error - as for each result of
+                            parse_uk_postcodes.
+        '''
+
+        key = (postcode, strict, incode_mandatory)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self._hits += 1
+                return result
+            self._misses += 1
+
+        # Parse without holding the lock, so that other threads are not held
+        # up. Two threads may occasionally parse the same value at once.
+        result = parser._parse(postcode, strict, incode_mandatory)
+        if result[2] is exceptions.MaxLengthExceededError:
+            return result
+
+        with self._lock:
+            self._results[key] = result
+            if self.maxsize is not None and len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    def cache_info(self):
+        '''Return hits, misses, evictions, maxsize and current size.'''
+
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             self.maxsize, len(self._results))
+
+    def cache_clear(self):
+        '''Empty the cache and reset its statistics.'''
+
+        with self._lock:
+            self._results.clear()
+            self._hits = self._misses = self._evictions = 0
@@ -0,0 +1,180 @@
+'''Command line interface
+
+Validates and splits a column of postcodes in a CSV or newline delimited
+file, streaming it in chunks so that files of any size run in constant
+memory. Run with python -m ukpostcodeparser --help for usage, or with
+serve to start the HTTP service in ukpostcodeparser.server.'''
+
+import argparse
+import csv
+import io
+import sys
+from itertools import islice, tee
+
+from ukpostcodeparser import parser
+from ukpostcodeparser.result import ResultCode
+
+
+# Reason written alongside each row for the outcome of parsing it
+REASONS = dict((code.exception, code.name.lower()) for code in ResultCode)
+
+OUTPUT_COLUMNS = ['outcode', 'incode', 'reason']
+
+
+def build_argument_parser():
+    argument_parser = argparse.ArgumentParser(
+        prog='python -m ukpostcodeparser',
+        description='Validate and split UK postcodes in a CSV or newline '
+                    'delimited file. Each row is written out with outcode, '
+                    'incode and reason columns appended.',
+        epilog='Run python -m ukpostcodeparser serve --help to serve '
+               'postcode parsing over HTTP instead.',
+    )
+    argument_parser.add_argument(
+        'input', nargs='?', default='-',
+        help='file to read, or - for standard input (the default)')
+    argument_parser.add_argument(
+        '-o', '--output', default='-',
+        help='file to write, or - for standard output (the default)')
+    argument_parser.add_argument(
+        '-c', '--column', default='0',
+        help='name or zero based index of the column holding postcodes '
+             '(default 0)')
+    argument_parser.add_argument(
+        '-l', '--lines', action='store_true',
+        help='treat each line of input as a single postcode, not as CSV')
+    argument_parser.add_argument(
+        '--no-header', dest='header', action='store_false',
+        help='the CSV input has no header row')
+    argument_parser.add_argument(
+        '-d', '--delimiter', default=',',
+        help='CSV field delimiter (default ,)')
+    argument_parser.add_argument(
+        '--encoding', default='utf-8',
+        help='encoding of input and output (default utf-8)')
+    argument_parser.add_argument(
+        '--non-strict', dest='strict', action='store_false',
+        help='split postcodes without validating them')
+    argument_parser.add_argument(
+        '--incode-optional', dest='incode_mandatory', action='store_false',
+        help='accept an outcode on its own')
+    argument_parser.add_argument(
+        '--chunk-size', type=int, default=10000,
+        help='rows to read and parse at a time (default 10000)')
+    argument_parser.add_argument(
+        '-w', '--workers', type=int, default=1,
+        help='number of processes to parse with (default 1)')
+    return argument_parser
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ['serve']:
+        from ukpostcodeparser import server
+        return server.main(argv[1:])
+
+    argument_parser = build_argument_parser()
+    args = argument_parser.parse_args(argv)
+    if args.chunk_size < 1:
+        argument_parser.error('--chunk-size must be at least 1')
+
+    source = _open_or_exit(argument_parser, args.input, 'r', args.encoding)
+    try:
+        target = _open_or_exit(argument_parser, args.output, 'w', args.encoding)
+    except SystemExit:
+        _close(source)
+        raise
+    try:
+        writer = csv.writer(target, delimiter=args.delimiter, lineterminator='\n')
+        if args.lines:
+            rows = ([line.rstrip('\r\n')] for line in source)
+            writer.writerow(['postcode'] + OUTPUT_COLUMNS)
+            column = 0
+        else:
+            rows = csv.reader(source, delimiter=args.delimiter)
+            column = _select_column(rows, writer, args.column, args.header)
+
+        if args.workers > 1:
+            # Rows wait in the tee until the pool hands back their results,
+            # which it does a few chunks at a time
+            rows, pending = tee(rows)
+            postcodes = (row[column] if column < len(row) else '' for row in rows)
+            results = parser.parse_uk_postcodes(
+                postcodes, args.strict, args.incode_mandatory,
+                workers=args.workers, chunksize=args.chunk_size
+            )
+            _write_results(writer, pending, results)
+        else:
+            for chunk in iter(lambda: list(islice(rows, args.chunk_size)), []):
+                postcodes = [row[column] if column < len(row) else '' for row in chunk]
+                results = parser.parse_uk_postcodes(
+                    postcodes, args.strict, args.incode_mandatory
+                )
+                _write_results(writer, chunk, results)
+    finally:
+        _close(source)
+        _close(target)
+    return 0
+
+
+def _write_results(writer, rows, results):
+    writer.writerows(
+        row + [outcode, incode, REASONS[error]]
+        for row, (outcode, incode, error) in zip(rows, results)
+    )
+
+
+def _select_column(rows, writer, column, header):
+    '''Work out which column to parse, copying any header to the output.'''
+
+    if not header:
+        if not column.isdigit():
+            raise SystemExit('--column must be an index when there is no header')
+        return int(column)
+
+    names = next(rows, [])
+    writer.writerow(names + OUTPUT_COLUMNS)
+    if column in names:
+        return names.index(column)
+    if column.isdigit() and int(column) < len(names):
+        return int(column)
+    raise SystemExit('Column {!r} not found in header'.format(column))
+
+
+def _open_or_exit(argument_parser, path, mode, encoding):
+    '''Open a file as _open does, reporting any failure as a usage error.'''
+
+    try:
+        return _open(path, mode, encoding)
+    except OSError as error:
+        argument_parser.error("can't open {!r}: {}".format(path, error.strerror or error))
+
+
+def _close(stream):
+    if stream is sys.stdout:
+        stream.flush()
+    elif stream is not sys.stdin:
+        stream.close()
+
+
+def _open(path, mode, encoding):
+    if path != '-':
+        return io.open(path, mode, encoding=encoding, newline='')
+    stream = sys.stdin if mode == 'r' else sys.stdout
+    if hasattr(stream, 'buffer'):
+        # Rewrap so that encoding and newline handling suit csv
+        return _StandardStream(stream.buffer, encoding=encoding, newline='')
+    return stream
+
+
+class _StandardStream(io.TextIOWrapper):
+    '''Text wrapper for standard input or output that leaves it open.'''
+
+    _detached = False
+
+    def close(self):
+        if not self._detached:
+            self._detached = True
+            self.flush()
+            self.detach()
@@ -0,0 +1,122 @@
+'''Compact integer encoding of UK postcodes
+
+Maps every full postcode the strict parser accepts to a distinct integer
+below 2 ** 32, and back. Integer order follows area, then district, then
+sector, then unit, so each area, district and sector occupies one
+contiguous range of integers.'''
+
+from ukpostcodeparser import exceptions, grammar, parser
+from ukpostcodeparser.result import Postcode
+
+
+INCODE_COUNT = 4000
+# Incode characters in order, and their positions
+_INCODE_CHARS = ''.join(parser.INCODE_CHARS)
+_INCODE_POSITIONS = dict((char, index) for index, char in enumerate(_INCODE_CHARS))
+_GIROBANK_INCODE = '0AA'
+
+
+def encode_postcode(postcode):
+    '''Return the integer for a postcode.
+
+    Arguments:
+    postcode            A postcode string, parsed as by parse_uk_postcode
+                        in strict mode, or an (outcode, incode) pair as
+                        returned by it.
+
+    Raises:             InvalidPostcodeError, or another ValueError as for
+                        parse_uk_postcode, if the postcode is not a valid
+                        full postcode.
+
+    Usage example:      >>> encode_postcode('SW1A 1AA') < encode_postcode('SW1A 2AA')
+                        True
+                        >>> decode_postcode(encode_postcode('sw1a 1aa'))
+                        ('SW1A', '1AA')
+    '''
+
+    if isinstance(postcode, tuple):
+        outcode, incode = postcode
+    else:
+        outcode, incode = parser.parse_uk_postcode(postcode)
+
+    tables = _tables()
+    rank = tables['ranks'].get(outcode)
+    if rank is None or len(incode) != 3 or (
+            outcode == 'GIR' and incode != _GIROBANK_INCODE):
+        raise exceptions.InvalidPostcodeError('Postcode cannot be encoded')
+    digit, first, second = incode
+    positions = _INCODE_POSITIONS
+    if digit not in parser.DIGITS or first not in positions or second not in positions:
+        raise exceptions.InvalidPostcodeError('Postcode cannot be encoded')
+
+    return (rank * INCODE_COUNT + int(digit) * 400 +
+            positions[first] * 20 + positions[second])
+
+
+def decode_postcode(code):
+    '''Return the Postcode for an integer from encode_postcode.
+
+    Raises:             ValueError, if no postcode has that integer.
+    '''
+
+    outcodes = _tables()['outcodes']
+    rank, remainder = divmod(code, INCODE_COUNT)
+    if code < 0 or rank >= len(outcodes):
+        raise ValueError('Not a postcode: {!r}'.format(code))
+    digit, remainder = divmod(remainder, 400)
+    first, second = divmod(remainder, 20)
+    outcode = outcodes[rank]
+    incode = str(digit) + _INCODE_CHARS[first] + _INCODE_CHARS[second]
+    if outcode == 'GIR' and incode != _GIROBANK_INCODE:
+        raise ValueError('Not a postcode: {!r}'.format(code))
+    return Postcode(outcode, incode)
+
+
+def prefix_range(prefix):
+    '''Return the range of integers of the postcodes starting with prefix.
+
+    Arguments:
+    prefix              A postcode area, e.g. 'SW', district, e.g. 'SW1A', or
+                        sector, e.g. 'SW1A 1', as given by the Postcode
+                        properties of the same names.
+
+    Returns:            start, stop - the integers of the postcodes in the
+                        area, district or sector are those from start up to,
+                        but not including, stop. Empty if none are valid.
+    '''
+
+    tables = _tables()
+    prefix = ' '.join(prefix.upper().split())
+    outcode, _, digit = prefix.partition(' ')
+    if not digit:
+        if outcode in tables['areas']:
+            first, last = tables['areas'][outcode]
+            return first * INCODE_COUNT, (last + 1) * INCODE_COUNT
+        rank = tables['ranks'].get(outcode)
+        if rank is None:
+            return 0, 0
+        return rank * INCODE_COUNT, (rank + 1) * INCODE_COUNT
+
+    rank = tables['ranks'].get(outcode)
+    if rank is None or len(digit) != 1 or digit not in parser.DIGITS:
+        return 0, 0
+    start = rank * INCODE_COUNT + int(digit) * 400
+    return start, start + 400
+
+
+_TABLES = {}
+
+
+def _tables():
+    '''Build, once, the tables mapping outcodes to and from their rank.'''
+
+    if not _TABLES:
+        tables = grammar._tables()
+        outcodes = tables['ordered']
+        ranks = dict(zip(outcodes, range(len(outcodes))))
+        # Each area's outcodes are consecutive, so its ranks are a range
+        areas = dict((area, (ranks[members[0]], ranks[members[-1]]))
+                     for area, members in tables['areas'].items())
+        areas['GIR'] = (ranks['GIR'], ranks['GIR'])
+        _TABLES.update(outcodes=outcodes, ranks=ranks, areas=areas)
+    return _TABLES
@@ -0,0 +1,97 @@
+'''Correction of mistyped or misread UK postcodes
+
+Provides correct_uk_postcode, which suggests the valid postcodes a value
+could have been meant as, allowing for the confusions typical of OCR.'''
+
+from ukpostcodeparser import parser, prefix
+from ukpostcodeparser.result import Postcode
+
+
+# Characters commonly misread as one another, each way round
+CONFUSIONS = {
+    'O': '0', '0': 'O',
+    'I': '1', '1': 'I',
+    'S': '5', '5': 'S',
+    'B': '8', '8': 'B',
+    'Z': '2', '2': 'Z',
+}
+# Fewest characters in a full postcode, without whitespace
+MIN_LENGTH = 5
+
+
+def correct_uk_postcode(value, max_edits=1):
+    '''Return the valid postcodes value is within max_edits of, best first.
+
+    An edit is replacing a character with one it is commonly confused with,
+    as listed in CONFUSIONS, or swapping two adjacent characters. Whitespace
+    is ignored, so a missing or misplaced space costs nothing, and letters
+    may be in either case.
+
+    Candidates are built a character at a time, following the grammar of
+    the strict parser, and abandoned as soon as they can no longer become a
+    valid postcode, so only a small part of the possible edits is ever
+    tried.
+
+    Arguments:
+    value               The postcode as read.
+    max_edits           Most edits to make to any one candidate.
+
+    Returns:            A list of Postcode, those needing fewer edits first,
+                        then in alphabetical order. If value is itself a
+                        valid postcode, it comes first. Empty if no
+                        candidate is valid.
+
+    Usage example:      >>> correct_uk_postcode('CRO 2YR')
+                        [('CR0', '2YR')]
+                        >>> correct_uk_postcode('SWIA IAA', max_edits=2)
+                        [('SW1A', '1AA')]
+    '''
+
+    if max_edits < 0:
+        raise ValueError('max_edits must not be negative')
+
+    chars = ''.join(value.split()).upper()
+    if not MIN_LENGTH <= len(chars) <= parser.MAX_LENGTH:
+        return []
+
+    prefix._tables()
+    found = {}
+    _search(chars, 0, ('', ()), 0, max_edits, found)
+    return sorted(found, key=lambda postcode: (found[postcode], postcode))
+
+
+def _search(chars, index, state, edits, max_edits, found):
+    '''Add to found each postcode reachable from state, with its edits.'''
+
+    if index == len(chars):
+        for outcode, incode in state[1]:
+            if len(incode) == 3:
+                postcode = Postcode(outcode, incode)
+                if edits < found.get(postcode, max_edits + 1):
+                    found[postcode] = edits
+        return
+
+    char = chars[index]
+    following = prefix._advance(state, char)
+    if _viable(following):
+        _search(chars, index + 1, following, edits, max_edits, found)
+
+    if edits == max_edits:
+        return
+
+    for replacement in CONFUSIONS.get(char, ''):
+        following = prefix._advance(state, replacement)
+        if _viable(following):
+            _search(chars, index + 1, following, edits + 1, max_edits, found)
+
+    if index + 1 < len(chars) and chars[index + 1] != char:
+        following = prefix._advance(state, chars[index + 1])
+        if _viable(following):
+            following = prefix._advance(following, char)
+            if _viable(following):
+                _search(chars, index + 2, following, edits + 1, max_edits, found)
+
+
+def _viable(state):
+    outcode, readings = state
+    return outcode is not None or bool(readings)
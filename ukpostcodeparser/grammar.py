@@ -0,0 +1,273 @@
+'''The strict UK postcode grammar, enumerated
+
+The rules in ukpostcodeparser.parser allow a finite number of outcodes and
+incodes. This module lists them, in a fixed order, generates or samples the
+full postcodes made of them, and builds the lookup tables derived from them
+the first time they are needed.'''
+
+import marshal
+import os
+
+from ukpostcodeparser import parser
+from ukpostcodeparser.result import Postcode
+
+
+DIGITS = '0123456789'
+# Names a file written by dump_tables, to be loaded rather than enumerating
+# the outcodes
+TABLES_ENVIRONMENT_VARIABLE = 'UKPOSTCODEPARSER_TABLES'
+# Outcodes the strict parser accepts outside of the usual rules
+SPECIAL_OUTCODES = ['BF1', 'GIR']
+
+
+def iter_outcodes():
+    '''Yield every outcode the strict parser accepts, in order.
+
+    Outcodes are ordered by area, then by district number, then by any
+    letter after the number - so 'SW1' comes before 'SW1A', then 'SW2',
+    with 'SW10' after 'SW9'. A district number written with a leading zero
+    follows the same number written without one.
+
+    The special British Forces and Girobank outcodes, BF1 and GIR, are
+    included. Outcodes with non-ASCII digits, which the strict parser also
+    accepts, are not.
+    '''
+
+    for _, outcodes in _iter_areas():
+        for outcode in outcodes:
+            yield outcode
+
+
+def iter_incodes():
+    '''Yield every incode the strict parser accepts, in alphabetical order.'''
+
+    for digit in DIGITS:
+        for first in parser.INCODE_CHARS:
+            for second in parser.INCODE_CHARS:
+                yield digit + first + second
+
+
+def iter_postcodes(areas=None):
+    '''Yield every full postcode POSTCODE_REGEX accepts, in order.
+
+    Postcodes are generated as they are needed, so the whole set, of over a
+    hundred million, is never held in memory. They are ordered by outcode,
+    as for iter_outcodes, then by incode. GIR 0AA, which the parser accepts
+    separately from POSTCODE_REGEX, is not included.
+
+    Arguments:
+    areas               If given, only postcodes in these areas, e.g. ['SW',
+                        'CR'], as given by Postcode.area.
+    '''
+
+    incodes = list(iter_incodes())
+    for outcode in _postcode_outcodes(areas):
+        for incode in incodes:
+            yield Postcode(outcode, incode)
+
+
+def sample_postcodes(count=None, seed=None, areas=None):
+    '''Yield postcodes chosen at random from those of iter_postcodes.
+
+    Every postcode is equally likely to be chosen each time, so the same
+    postcode may be chosen more than once.
+
+    Arguments:
+    count               How many postcodes to yield, or None for no end.
+    seed                Seed for the random choices, so that the same seed
+                        always gives the same postcodes.
+    areas               As for iter_postcodes.
+
+    Usage example:      >>> list(sample_postcodes(2, seed=1, areas=['CR']))
+                        [('CR2P', '2FQ'), ('CR19', '2DS')]
+    '''
+
+    import random
+
+    outcodes = _postcode_outcodes(areas)
+    incodes = list(iter_incodes())
+    rng = random.Random(seed)
+    total = len(outcodes) * len(incodes)
+    if not total:
+        return
+    remaining = count
+    while remaining is None or remaining > 0:
+        outcode, incode = divmod(rng.randrange(total), len(incodes))
+        yield Postcode(outcodes[outcode], incodes[incode])
+        if remaining is not None:
+            remaining -= 1
+
+
+def shard_areas(shard, shards):
+    '''Return the areas in one of a number of shards, for iter_postcodes.
+
+    Areas are dealt out in alphabetical order, so every area is in exactly
+    one shard, and always the same one for the same number of shards.
+
+    Arguments:
+    shard               Which shard, from 0 up to shards - 1.
+    shards              How many shards in all.
+    '''
+
+    if not 0 <= shard < shards:
+        raise ValueError('shard must be from 0 up to shards - 1')
+    return sorted(_tables()['areas'])[shard::shards]
+
+
+def intern_postcode(outcode, incode):
+    '''Return a Postcode made of shared, canonical outcode and incode strings.
+
+    Every postcode holding the same outcode then refers to a single string
+    object, as does every postcode holding the same incode, which saves a
+    great deal of memory across large numbers of results. Strings outside
+    the strict grammar are used as they are.
+    '''
+
+    table = _tables()['intern']
+    return Postcode(table.get(outcode, outcode), table.get(incode, incode))
+
+
+def dump_tables(path):
+    '''Write the outcodes of the grammar to a file, for load_tables.
+
+    Loading them takes a fraction of the time of enumerating them. Only
+    interning and the codec, prefix validation, correction and indexes
+    built on it need them - the parser does not - so this helps processes
+    that start often and use those, such as command line tools and
+    serverless functions. The file must be rebuilt after upgrading, and is
+    ignored, or refused by load_tables, if it does not match the grammar.
+    '''
+
+    # Space separated, as one long string loads faster than many short ones
+    data = (_TABLES_FORMAT, _fingerprint(),
+            tuple((area, ' '.join(outcodes)) for area, outcodes in _iter_areas()))
+    with open(path, 'wb') as stream:
+        stream.write(marshal.dumps(data))
+
+
+def load_tables(path):
+    '''Load outcodes written by dump_tables, instead of enumerating them.
+
+    Call before anything needs the tables. Setting the
+    UKPOSTCODEPARSER_TABLES environment variable to the path instead loads
+    them when first needed.
+
+    Raises:             ValueError, if the file was not written by
+                        dump_tables for this grammar.
+    '''
+
+    areas = _read_tables(path)
+    if 'intern' not in _TABLES:
+        _TABLES['loaded'] = areas
+
+
+# Changed whenever the layout written by dump_tables changes
+_TABLES_FORMAT = 2
+
+
+def _fingerprint():
+    '''Return a string that changes whenever the grammar does.'''
+
+    return '|'.join([' '.join(parser.POSTAL_ZONES), ''.join(parser.THIRD_POS_CHARS),
+                     ''.join(parser.FOURTH_POS_CHARS), ''.join(parser.INCODE_CHARS),
+                     ' '.join(SPECIAL_OUTCODES)])
+
+
+def _read_tables(path):
+    '''Return the areas and their outcodes from a dump_tables file, as
+    _iter_areas yields them.'''
+
+    with open(path, 'rb') as stream:
+        try:
+            data = marshal.loads(stream.read())
+        except (EOFError, TypeError, ValueError):
+            data = None
+    if not isinstance(data, tuple) or len(data) != 3:
+        raise ValueError('Not a postcode tables file: {}'.format(path))
+    version, fingerprint, areas = data
+    if version != _TABLES_FORMAT or fingerprint != _fingerprint():
+        raise ValueError('Postcode tables file is out of date: {}'.format(path))
+    return [(area, outcodes.split(' ')) for area, outcodes in areas]
+
+
+def _environment_tables():
+    '''Return the areas from the file named by UKPOSTCODEPARSER_TABLES, or
+    None.'''
+
+    path = os.environ.get(TABLES_ENVIRONMENT_VARIABLE)
+    if path:
+        try:
+            return _read_tables(path)
+        except (OSError, ValueError):
+            # Enumerating the outcodes gives the same answers, only slower
+            pass
+    return None
+
+
+_TABLES = {}
+
+
+def _tables():
+    '''Build, once, the tables derived from the grammar.
+
+    The tables of the codec and of prefix validation are built from these,
+    so that the grammar is only enumerated once per process.
+    '''
+
+    if 'intern' not in _TABLES:
+        loaded = _TABLES.pop('loaded', None) or _environment_tables()
+        outcodes, areas = [], {}
+        for area, members in loaded or _iter_areas():
+            outcodes.extend(members)
+            if area != 'GIR':
+                # The outcodes of POSTCODE_REGEX in each area, in order
+                areas[area] = members
+        incodes = list(iter_incodes())
+        strings = outcodes + incodes + ['']
+        _TABLES.update(
+            # GIR is only valid as part of GIR 0AA, which the parser checks
+            # for separately
+            outcodes=frozenset(outcodes) - frozenset(['GIR']),
+            incodes=frozenset(incodes),
+            ordered=outcodes,
+            areas=areas,
+            intern=dict(zip(strings, strings)),
+        )
+    return _TABLES
+
+
+def _iter_areas():
+    '''Yield each area, in order, with a list of its outcodes in order.
+
+    GIR is yielded as an area of its own.
+    '''
+
+    areas = [(zone, parser.THIRD_POS_CHARS) for zone in parser.POSTAL_ZONES_ONE_CHAR]
+    areas += [(zone, parser.FOURTH_POS_CHARS) for zone in parser.POSTAL_ZONES_TWO_CHARS]
+    areas += [(outcode, None) for outcode in SPECIAL_OUTCODES]
+
+    for area, letters in sorted(areas):
+        if letters is None:
+            # Special case, a single outcode
+            yield Postcode(area).area, [area]
+            continue
+        outcodes = []
+        for number in range(100):
+            if number < 10:
+                district = area + str(number)
+                outcodes.append(district)
+                outcodes.extend(district + letter for letter in letters)
+            outcodes.append('{}{:02d}'.format(area, number))
+        yield area, outcodes
+
+
+def _postcode_outcodes(areas):
+    '''Return the outcodes of POSTCODE_REGEX in areas, in order.'''
+
+    by_area = _tables()['areas']
+    if areas is None:
+        areas = by_area
+    outcodes = []
+    for area in sorted(set(areas)):
+        outcodes.extend(by_area.get(area, []))
+    return outcodes
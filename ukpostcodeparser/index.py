@@ -0,0 +1,276 @@
+'''Sorted index of UK postcodes
+
+Provides PostcodeIndex, a set of postcodes held as a sorted array of the
+integers given by codec.encode_postcode. As each area, district and sector
+is one range of those integers, finding the postcodes that start with a
+prefix is two binary searches rather than a scan.
+
+An index can be saved to a file, and either loaded back into memory, or
+memory mapped as a MappedPostcodeIndex, which reads nothing but its header
+when opened and whose pages are shared by every process mapping the file.
+The first query in a process still builds the codec's tables, as any use
+of the codec does, unless they are loaded from a grammar.dump_tables file.
+
+The file holds, all little endian:
+header              The magic bytes b'UKPCIDX2', a CRC-32 of the grammar,
+                    the number of outcodes in codec order and the number
+                    of postcodes, as struct '<8sIIQ'.
+offsets             For each outcode rank, and one more, the position in
+                    codes of the first postcode with that outcode or a
+                    later one, as uint32.
+codes               The sorted integers of the postcodes, as uint32.'''
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+
+from ukpostcodeparser import codec, grammar, parser
+
+
+MAGIC = b'UKPCIDX2'
+_HEADER = struct.Struct('<8sIIQ')
+
+
+class _SortedCodes(object):
+    '''Queries over sorted postcode integers and their outcode offsets.
+
+    Subclasses set _codes and _offsets, which may be any sequences of ints.
+    '''
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __iter__(self):
+        decode = codec.decode_postcode
+        for code in self._codes:
+            yield decode(code)
+
+    def __contains__(self, postcode):
+        try:
+            code = codec.encode_postcode(postcode)
+        except (TypeError, ValueError):
+            # Not a postcode, so not in the index, as for a set
+            return False
+        # Only the postcodes with the same outcode need searching
+        rank = code // codec.INCODE_COUNT
+        codes = self._codes
+        position = bisect_left(codes, code, self._offsets[rank], self._offsets[rank + 1])
+        return position < len(codes) and codes[position] == code
+
+    def iter_prefix(self, prefix):
+        '''Yield each postcode in an area, district or sector, in order.
+
+        Arguments:
+        prefix              As for codec.prefix_range - an area such as 'SW',
+                            a district such as 'SW1A', or a sector such as
+                            'SW1A 1'.
+        '''
+
+        start, stop = self._prefix_positions(prefix)
+        codes, decode = self._codes, codec.decode_postcode
+        for position in range(start, stop):
+            yield decode(codes[position])
+
+    def count_prefix(self, prefix):
+        '''Return the number of postcodes in an area, district or sector.'''
+
+        start, stop = self._prefix_positions(prefix)
+        return stop - start
+
+    def codes(self):
+        '''Return the sorted integers of the postcodes, as an array('I').'''
+
+        return array('I', self._codes)
+
+    def save(self, path):
+        '''Write the index to a file, for PostcodeIndex.load or
+        MappedPostcodeIndex.'''
+
+        offsets, codes = array('I', self._offsets), array('I', self._codes)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+            codes.byteswap()
+        with open(path, 'wb') as stream:
+            stream.write(_HEADER.pack(MAGIC, _grammar_checksum(), len(offsets) - 1, len(codes)))
+            offsets.tofile(stream)
+            codes.tofile(stream)
+
+    def _prefix_positions(self, prefix):
+        start, stop = codec.prefix_range(prefix)
+        if start == stop:
+            return 0, 0
+        offsets, size = self._offsets, codec.INCODE_COUNT
+        first, last = start // size, (stop - 1) // size
+        if start % size == 0 and stop % size == 0:
+            # A whole area or district, straight from the offsets
+            return offsets[first], offsets[last + 1]
+        codes = self._codes
+        start = bisect_left(codes, start, offsets[first], offsets[last + 1])
+        return start, bisect_left(codes, stop, start, offsets[last + 1])
+
+
+class PostcodeIndex(_SortedCodes):
+    '''An immutable set of full postcodes, with prefix queries.
+
+    Membership and counting take O(log n) time, as do prefix queries, plus
+    the time to iterate over what they find. Each postcode takes four
+    bytes.
+
+    Usage example:      >>> index = PostcodeIndex(['SW1A 1AA', 'sw1a 2aa', 'cr0 2yr'])
+                        >>> 'SW1A1AA' in index
+                        True
+                        >>> list(index.iter_prefix('SW1A'))
+                        [('SW1A', '1AA'), ('SW1A', '2AA')]
+                        >>> index.count_prefix('SW1A 2')
+                        1
+    '''
+
+    def __init__(self, postcodes=()):
+        '''Arguments:
+        postcodes           Postcode strings, parsed as by parse_uk_postcode
+                            in strict mode, or (outcode, incode) pairs as
+                            returned by it. Duplicates are dropped.
+
+        Raises:             InvalidPostcodeError, or another ValueError as
+                            for parse_uk_postcode, for anything that is not
+                            a valid full postcode.
+        '''
+
+        codes = array('I', (codec.encode_postcode(postcode) for postcode in postcodes))
+        self._set_codes(_sorted_unique(codes))
+
+    @classmethod
+    def from_codes(cls, codes):
+        '''Return an index of the integers from codec.encode_postcode.'''
+
+        index = cls.__new__(cls)
+        index._set_codes(_sorted_unique(array('I', codes)))
+        return index
+
+    @classmethod
+    def load(cls, path):
+        '''Return the index saved to a file, read into memory.
+
+        Raises:             ValueError, if the file was not written by save,
+                            or was written for a different grammar.
+        '''
+
+        with open(path, 'rb') as stream:
+            outcode_count, count = _read_header(stream.read(_HEADER.size), path)
+            offsets, codes = array('I'), array('I')
+            try:
+                offsets.fromfile(stream, outcode_count + 1)
+                codes.fromfile(stream, count)
+            except EOFError:
+                raise ValueError('Postcode index file is truncated: {}'.format(path))
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+            codes.byteswap()
+        index = cls.__new__(cls)
+        index._codes, index._offsets = codes, offsets
+        return index
+
+    def _set_codes(self, codes):
+        self._codes = codes
+        boundaries = range(0, (_outcode_count() + 1) * codec.INCODE_COUNT, codec.INCODE_COUNT)
+        numpy = _numpy() if codes else None
+        if numpy is not None:
+            positions = numpy.searchsorted(numpy.frombuffer(codes, dtype=numpy.uint32),
+                                           numpy.array(boundaries, dtype=numpy.int64))
+            self._offsets = array('I', positions.astype(numpy.uint32).tobytes())
+        else:
+            self._offsets = array('I', (bisect_left(codes, boundary) for boundary in boundaries))
+
+
+class MappedPostcodeIndex(_SortedCodes):
+    '''A PostcodeIndex file, memory mapped rather than read.
+
+    Opening one reads only its header, and queries read only the pages
+    they need, which the operating system shares between every process
+    mapping the same file - such as forked server workers. Queries are as
+    for PostcodeIndex. Needs a little endian machine, as nearly all are.
+
+    Usage example:      >>> PostcodeIndex(['cr0 2yr']).save('postcodes.idx')
+                        >>> with MappedPostcodeIndex('postcodes.idx') as index:
+                        ...     'CR0 2YR' in index
+                        True
+    '''
+
+    def __init__(self, path):
+        '''Raises:          ValueError, as for PostcodeIndex.load.'''
+
+        if sys.byteorder != 'little':
+            raise ValueError('Postcode index files can only be mapped on little endian machines')
+        with open(path, 'rb') as stream:
+            outcode_count, count = _read_header(stream.read(_HEADER.size), path)
+            size = _HEADER.size + 4 * (outcode_count + 1 + count)
+            if stream.seek(0, 2) < size:
+                raise ValueError('Postcode index file is truncated: {}'.format(path))
+            self._mmap = mmap.mmap(stream.fileno(), size, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        start = _HEADER.size
+        middle = start + 4 * (outcode_count + 1)
+        self._offsets = view[start:middle].cast('I')
+        self._codes = view[middle:size].cast('I')
+
+    def close(self):
+        '''Unmap the file. The index cannot be used afterwards.'''
+
+        if self._mmap is not None:
+            self._offsets.release()
+            self._codes.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _read_header(header, path):
+    '''Return the outcode and postcode counts from a file's header.'''
+
+    if len(header) != _HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not a postcode index file: {}'.format(path))
+    _, checksum, outcode_count, count = _HEADER.unpack(header)
+    if checksum != _grammar_checksum() or outcode_count != _outcode_count():
+        raise ValueError('Postcode index file is for a different grammar: {}'.format(path))
+    return outcode_count, count
+
+
+def _grammar_checksum():
+    return zlib.crc32(grammar._fingerprint().encode('ascii'))
+
+
+def _outcode_count():
+    '''Return the number of outcodes the codec ranks, without building its
+    tables.'''
+
+    # Each area has districts 0 to 9, each also with a letter, and 00 to 99
+    return (sum(110 + 10 * len(parser.THIRD_POS_CHARS) for _ in parser.POSTAL_ZONES_ONE_CHAR) +
+            sum(110 + 10 * len(parser.FOURTH_POS_CHARS) for _ in parser.POSTAL_ZONES_TWO_CHARS) +
+            len(grammar.SPECIAL_OUTCODES))
+
+
+def _numpy():
+    '''Return numpy, imported only when an index is built, or None.'''
+
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - depends on the environment
+        return None
+    return numpy
+
+
+def _sorted_unique(codes):
+    '''Return codes, an array('I'), sorted and without duplicates.'''
+
+    numpy = _numpy() if codes else None
+    if numpy is not None:
+        return array('I', numpy.unique(numpy.frombuffer(codes, dtype=numpy.uint32)).tobytes())
+    return array('I', sorted(set(codes)))
@@ -0,0 +1,260 @@
+'''Opt-in counters and timings for UK postcode parsing
+
+Provides ParserMetrics, which counts parse results by outcome and by the
+path taken through the parser, and can time each path. Nothing is counted
+until enable() is called, and until then parsing costs exactly what it did,
+as the parser is only wrapped while metrics are enabled.
+
+Parsing through parse_uk_postcode, parse_uk_postcodes without workers and
+CachedPostcodeParser (on cache misses) is counted, as are the rows the
+vectorised parser hands to parse_uk_postcode's core - those with non-ASCII
+characters or too wide for its arrays. Parsing in other processes, and the
+rows the vectorised parser handles itself, is not.
+
+The prometheus_client package is optional, only needed for
+register_prometheus, and only imported by it.
+
+Usage example:      >>> from ukpostcodeparser import metrics, parse_uk_postcode
+                    >>> counts = metrics.enable()
+                    >>> parse_uk_postcode('cr0 2yr')
+                    ('CR0', '2YR')
+                    >>> counts.as_dict()['outcomes']
+                    {'full': 1}
+                    >>> metrics.disable()
+'''
+
+from bisect import bisect_left
+from collections import Counter
+from threading import Lock
+from time import perf_counter
+
+from ukpostcodeparser import exceptions, parser
+
+
+# Upper bounds, in seconds, of the timing histogram buckets
+TIMING_BUCKETS = (1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 1e-3, float('inf'))
+
+# The parser as it is without metrics
+_PARSE = parser._parse
+
+
+class ParserMetrics(object):
+    '''Counts of parse results, by outcome and by path through the parser.
+
+    Outcomes:
+    full                A full postcode, other than the two below.
+    girobank            GIR 0AA, or GIR alone.
+    british_forces      A BF1 postcode or outcode.
+    outcode_only        An outcode accepted without an incode.
+    incode_missing      An outcode rejected for want of an incode.
+    max_length          Too long to be a postcode.
+    invalid             Not a postcode in strict mode.
+
+    Paths:
+    full_match          Strict, matched as a full postcode.
+    outcode_fallback    Strict, matched as an outcode alone, once matching
+                        as a full postcode had failed.
+    girobank            Strict, matched the Girobank special case, once
+                        matching both ways had failed.
+    no_match            Strict, matched nothing. Each of these has cost a
+                        failed full match, outcode match and Girobank test.
+    chop                Not strict, split by length alone.
+    too_long            Rejected on length, before any matching.
+
+    Safe to share between threads.
+    '''
+
+    def __init__(self, timings=False):
+        '''Arguments:
+        timings             If true, also keep a histogram of how long each
+                            path takes, with buckets of TIMING_BUCKETS.
+        '''
+
+        self.timings = timings
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        '''Set every count back to zero.'''
+
+        with self._lock:
+            self._outcomes = Counter()
+            self._paths = Counter()
+            # Per path, a count per bucket and the total seconds
+            self._histograms = {}
+
+    def record(self, postcode, strict, normalise, result, seconds=None):
+        '''Count one result of parser._parse, and how long it took.
+
+        Arguments:
+        postcode            The postcode as given to the parser.
+        strict              The strict flag it was parsed with.
+        normalise           The normalise function it was parsed with, or
+                            None for normalise_postcode.
+        result              The outcode, incode, error it gave.
+        seconds             How long parsing took, if timed.
+        '''
+
+        outcome, path = _classify(postcode, strict, normalise, result)
+        with self._lock:
+            self._outcomes[outcome] += 1
+            self._paths[path] += 1
+            if seconds is not None:
+                buckets, total = self._histograms.get(path, ([0] * len(TIMING_BUCKETS), 0.0))
+                buckets[bisect_left(TIMING_BUCKETS, seconds)] += 1
+                self._histograms[path] = (buckets, total + seconds)
+
+    def as_dict(self):
+        '''Return the counts as plain dicts.
+
+        Returns:            A dict with 'outcomes' and 'paths', each mapping
+                            names to counts, and with timings, 'timings',
+                            mapping each path to a dict of 'buckets' - the
+                            count per bucket of TIMING_BUCKETS, not
+                            cumulative - and 'seconds', the total time.
+        '''
+
+        with self._lock:
+            counts = {'outcomes': dict(self._outcomes), 'paths': dict(self._paths)}
+            if self.timings:
+                counts['timings'] = dict(
+                    (path, {'buckets': list(buckets), 'seconds': total})
+                    for path, (buckets, total) in self._histograms.items()
+                )
+        return counts
+
+
+def _classify(postcode, strict, normalise, result):
+    '''Return the outcome and path that gave a result of parser._parse.'''
+
+    outcode, incode, error = result
+    if error is exceptions.MaxLengthExceededError:
+        return 'max_length', 'too_long'
+    if error is exceptions.InvalidPostcodeError:
+        return 'invalid', 'no_match'
+
+    if not strict:
+        path = 'chop'
+    elif outcode == 'GIR' or (
+            error is not None and (normalise or parser.normalise_postcode)(postcode) == 'GIR'):
+        path = 'girobank'
+    elif incode:
+        path = 'full_match'
+    else:
+        path = 'outcode_fallback'
+
+    if error is not None:
+        outcome = 'incode_missing'
+    elif outcode == 'GIR':
+        outcome = 'girobank'
+    elif outcode == 'BF1':
+        outcome = 'british_forces'
+    elif incode:
+        outcome = 'full'
+    else:
+        outcome = 'outcode_only'
+    return outcome, path
+
+
+def enable(metrics=None):
+    '''Start counting parse results, replacing any metrics already enabled.
+
+    Arguments:
+    metrics             The ParserMetrics to count into, by default a new
+                        one without timings.
+
+    Returns:            The ParserMetrics counted into.
+    '''
+
+    if metrics is None:
+        metrics = ParserMetrics()
+    record = metrics.record
+
+    if metrics.timings:
+        def parse(postcode, strict, incode_mandatory, normalise=None):
+            start = perf_counter()
+            result = _PARSE(postcode, strict, incode_mandatory, normalise)
+            record(postcode, strict, normalise, result, perf_counter() - start)
+            return result
+    else:
+        def parse(postcode, strict, incode_mandatory, normalise=None):
+            result = _PARSE(postcode, strict, incode_mandatory, normalise)
+            record(postcode, strict, normalise, result)
+            return result
+
+    parse.metrics = metrics
+    parser._parse = parse
+    return metrics
+
+
+def disable():
+    '''Stop counting parse results.'''
+
+    parser._parse = _PARSE
+
+
+def enabled():
+    '''Return the ParserMetrics being counted into, or None.'''
+
+    return getattr(parser._parse, 'metrics', None)
+
+
+def register_prometheus(metrics, registry=None, prefix='ukpostcodeparser'):
+    '''Export metrics through prometheus_client.
+
+    Adds a collector to registry, by default the global registry, giving
+    counters <prefix>_outcomes_total and <prefix>_paths_total, labelled by
+    outcome and path, and with timings a <prefix>_parse_seconds histogram
+    labelled by path.
+
+    Returns:            The collector, for passing to registry.unregister.
+    '''
+
+    core = _prometheus_core()
+    collector = _PrometheusCollector(metrics, prefix)
+    if registry is None:
+        registry = core.REGISTRY
+    registry.register(collector)
+    return collector
+
+
+class _PrometheusCollector(object):
+
+    def __init__(self, metrics, prefix):
+        self._metrics = metrics
+        self._prefix = prefix
+
+    def collect(self):
+        core = _prometheus_core()
+        counts = self._metrics.as_dict()
+        for name, label in [('outcomes', 'outcome'), ('paths', 'path')]:
+            family = core.CounterMetricFamily(
+                '{}_{}'.format(self._prefix, name),
+                'Postcodes parsed, by {}'.format(label), labels=[label]
+            )
+            for value, count in sorted(counts[name].items()):
+                family.add_metric([value], count)
+            yield family
+
+        if 'timings' in counts:
+            family = core.HistogramMetricFamily(
+                '{}_parse_seconds'.format(self._prefix),
+                'Time taken to parse a postcode, by path', labels=['path']
+            )
+            for path, timing in sorted(counts['timings'].items()):
+                cumulative, buckets = 0, []
+                for bound, count in zip(TIMING_BUCKETS, timing['buckets']):
+                    cumulative += count
+                    buckets.append(('+Inf' if bound == float('inf') else repr(bound), cumulative))
+                family.add_metric([path], buckets, timing['seconds'])
+            yield family
+
+
+def _prometheus_core():
+    '''Return prometheus_client.core, imported when first needed.'''
+
+    try:
+        import prometheus_client.core
+    except ImportError:
+        raise ImportError('prometheus_client is required for Prometheus metrics')
+    return prometheus_client.core
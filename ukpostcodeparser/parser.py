@@ -7,11 +7,14 @@
 # Notes      :
 '''UK postcode parser
 
-Provides the parse_uk_postcode function for parsing UK postcodes.'''
+Provides the parse_uk_postcode function for parsing UK postcodes, and
+parse_uk_postcodes for parsing many of them at once.'''
 
-import re
+from collections import deque
+from itertools import islice
 
 from ukpostcodeparser import exceptions
+from ukpostcodeparser.result import Postcode
 
 
 # Build up the regex patterns piece by piece
@@ -36,31 +39,26 @@ FOURTH_POS_CHARS = ['A', 'B', 'E', 'H', 'M', 'N', 'P', 'R', 'V', 'W', 'X',
                     'Y']
 INCODE_CHARS = ['A', 'B', 'D', 'E', 'F', 'G', 'H', 'J', 'L', 'N', 'P', 'Q',
                 'R', 'S', 'T', 'U', 'W', 'X', 'Y', 'Z']
-OUTCODE_PATTERN = (r'(' +
-                   r'(?:(?:' +
-                   '|'.join(POSTAL_ZONES_ONE_CHAR) +
-                   r')(?:\d[' +
-                   ''.join(THIRD_POS_CHARS) +
-                   r']|\d{1,2}))' +
-                   r'|' +
-                   r'(?:(?:' +
-                   '|'.join(POSTAL_ZONES_TWO_CHARS) +
-                   r')(?:\d[' +
-                   ''.join(FOURTH_POS_CHARS) +
-                   r']|\d{1,2}))' +
-                   r'|(?:BF1)' +  # special case for british forces postcodes
-                   r')')
-INCODE_PATTERN = (r'(\d[' +
-                  ''.join(INCODE_CHARS) +
-                  r'][' +
-                  ''.join(INCODE_CHARS) +
-                  r'])')
-POSTCODE_PATTERN = OUTCODE_PATTERN + INCODE_PATTERN
-STANDALONE_OUTCODE_PATTERN = OUTCODE_PATTERN + r'\s*$'
-
-# Compile regexs
-POSTCODE_REGEX = re.compile(POSTCODE_PATTERN)
-STANDALONE_OUTCODE_REGEX = re.compile(STANDALONE_OUTCODE_PATTERN)
+
+# The regex patterns, and the regexs compiled from them, are only built when
+# first used, as most processes never need them - see _regexs
+_LAZY_NAMES = frozenset(['OUTCODE_PATTERN', 'INCODE_PATTERN', 'POSTCODE_PATTERN',
+                         'STANDALONE_OUTCODE_PATTERN', 'POSTCODE_REGEX',
+                         'STANDALONE_OUTCODE_REGEX'])
+
+# Longest postcode accepted, ignoring whitespace
+MAX_LENGTH = 7
+# Inputs no longer than this are normalised without counting characters first
+SHORT_INPUT_LENGTH = 16
+
+# Character class tables for the strict state machine, built from the same
+# lists as the regexs above
+DIGITS = frozenset('0123456789')
+ONE_CHAR_ZONES = frozenset(POSTAL_ZONES_ONE_CHAR)
+TWO_CHAR_ZONES = frozenset(POSTAL_ZONES_TWO_CHARS)
+THIRD_POS_CLASS = frozenset(THIRD_POS_CHARS) | DIGITS
+FOURTH_POS_CLASS = frozenset(FOURTH_POS_CHARS) | DIGITS
+INCODE_CLASS = frozenset(INCODE_CHARS)
 
 
 def parse_uk_postcode(postcode, strict=True, incode_mandatory=True):
@@ -76,11 +74,13 @@ def parse_uk_postcode(postcode, strict=True, incode_mandatory=True):
     incode_mandatory    If true, and only an outcode has been supplied, the
                         function will throw a ValueError.
 
-    Returns:            outcode, incode
+    Returns:            A Postcode - an (outcode, incode) tuple, which also
+                        gives the postcode's area, district and sector.
 
     Raises:             ValueError, if postcode is longer than seven
-                        characters, or if 'strict' or 'incode_mandatory'
-                        conditions are broken - see above.
+                        characters once whitespace is removed, or if
+                        'strict' or 'incode_mandatory' conditions are
+                        broken - see above.
 
     Usage example:      >>> from postcode import parse_uk_postcode
                         >>> parse_uk_postcode('cr0 2yr')
@@ -98,49 +98,343 @@ def parse_uk_postcode(postcode, strict=True, incode_mandatory=True):
     [2] http://web.archive.org/web/20090930140939/http://www.govtalk.gov.uk/gdsc/html/noframes/PostCode-2-1-Release.htm
     '''
 
-    postcode = postcode.replace(' ', '').upper()  # Normalize
+    outcode, incode, error = _parse(postcode, strict, incode_mandatory)
+    if error is not None:
+        raise error(*ERROR_MESSAGES[error])
+    return Postcode(outcode, incode)
+
+
+def parse_uk_postcodes(postcodes, strict=True, incode_mandatory=True,
+                       normalise=None, workers=None, chunksize=10000,
+                       intern=False):
+    '''Split many UK postcodes into outcode and incode portions.
+
+    Batch counterpart to parse_uk_postcode. Rather than raising, a result is
+    yielded for every input, so invalid values cost no more than valid ones.
+
+    Arguments:
+    postcodes           An iterable of postcodes to be split.
+    strict              As for parse_uk_postcode.
+    incode_mandatory    As for parse_uk_postcode.
+    normalise           Function used in place of normalise_postcode to
+                        prepare each postcode for parsing. It must return
+                        None for values longer than MAX_LENGTH. With
+                        workers, it must be picklable.
+    workers             If more than one, parse in a pool of this many
+                        processes. Results are still yielded in input order.
+    chunksize           With workers, the number of postcodes sent to a
+                        process at a time. Larger chunks spread the cost of
+                        passing data between processes more thinly, but
+                        hold more results in memory.
+    intern              If true, valid outcodes and incodes are returned as
+                        shared string objects, one per distinct value, as
+                        for grammar.intern_postcode.
+
+    Yields:             outcode, incode, error - error is None on success,
+                        otherwise the exception class parse_uk_postcode would
+                        have raised, in which case outcode and incode are
+                        empty strings.
+
+    Usage example:      >>> list(parse_uk_postcodes(['cr0 2yr', 'cr0']))
+                        [('CR0', '2YR', None), ('', '', <class 'ukpostcodeparser.exceptions.IncodeNotFoundError'>)]
+    '''
+
+    if workers is not None and workers > 1:
+        results = _parse_in_pool(postcodes, strict, incode_mandatory,
+                                 normalise, workers, chunksize)
+    else:
+        results = _parse_all(postcodes, strict, incode_mandatory, normalise)
+    if intern:
+        # After any pool, as sharing does not survive pickling
+        results = _intern_all(results)
+    return results
+
+
+def _intern_all(results):
+    from ukpostcodeparser import grammar
+
+    table = grammar._tables()['intern']
+    for outcode, incode, error in results:
+        yield table.get(outcode, outcode), table.get(incode, incode), error
+
+
+def _parse_all(postcodes, strict, incode_mandatory, normalise=None):
+    parse = _parse
+    for postcode in postcodes:
+        yield parse(postcode, strict, incode_mandatory, normalise)
+
+
+def _parse_chunk(postcodes, strict, incode_mandatory, normalise):
+    return list(_parse_all(postcodes, strict, incode_mandatory, normalise))
+
+
+def _parse_in_pool(postcodes, strict, incode_mandatory, normalise, workers,
+                   chunksize):
+    '''Parse chunks of postcodes in a process pool, in input order.
+
+    Only a couple of chunks per process are in flight at once, so memory use
+    does not depend on how many postcodes there are.
+    '''
+
+    import multiprocessing
+
+    postcodes = iter(postcodes)
+    chunks = iter(lambda: list(islice(postcodes, chunksize)), [])
+    pool = multiprocessing.Pool(workers)
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(
+                _parse_chunk, (chunk, strict, incode_mandatory, normalise)
+            ))
+            if len(pending) >= workers * 2:
+                for result in pending.popleft().get():
+                    yield result
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+# Arguments used to construct each exception when parse_uk_postcode raises
+ERROR_MESSAGES = {
+    exceptions.MaxLengthExceededError: (),
+    exceptions.IncodeNotFoundError: ('Incode mandatory',),
+    exceptions.InvalidPostcodeError: (
+        'Value provided does not align with UK postcode rules',
+    ),
+}
+
+
+def normalise_postcode(postcode):
+    '''Strip all whitespace from a postcode and convert it to upper case.
+
+    Returns None as soon as the postcode is known to be longer than
+    MAX_LENGTH characters, without copying the rest of it.
+    '''
+
+    if len(postcode) > SHORT_INPUT_LENGTH:
+        remaining = MAX_LENGTH
+        for char in postcode:
+            if not char.isspace():
+                remaining -= 1
+                if remaining < 0:
+                    return None
+
+    postcode = postcode.replace(' ', '')
+    if not postcode.isalnum():
+        # Tabs, non-breaking spaces and other whitespace are rare, so only
+        # look for them when something other than letters and digits is left
+        postcode = ''.join(postcode.split())
+    postcode = postcode.upper()
+    if len(postcode) > MAX_LENGTH:
+        return None
+    return postcode
+
+
+def _parse(postcode, strict, incode_mandatory, normalise=None):
+    '''Core of parse_uk_postcode, returning outcode, incode, error.
+
+    Failures are reported by returning the exception class rather than
+    raising it, so callers handling many postcodes avoid building exceptions.
+    '''
+
+    postcode = (normalise or normalise_postcode)(postcode)
 
-    if len(postcode) > 7:
-        raise exceptions.MaxLengthExceededError()
+    if postcode is None:
+        return '', '', exceptions.MaxLengthExceededError
 
     # Validate postcode
     if strict:
 
-        # Try for full postcode match
-        postcode_match = POSTCODE_REGEX.match(postcode)
-        if postcode_match:
-            return postcode_match.group(1, 2)
+        if postcode.isascii():
+            outcode, incode, found = match_strict(postcode)
+        else:
+            # \d also matches non-ASCII digits, leave those to the regexs
+            outcode, incode, found = _match_strict_regex(postcode)
+
+        # Full postcode match
+        if incode:
+            return outcode, incode, None
 
-        # Try for outcode only match
-        outcode_match = STANDALONE_OUTCODE_REGEX.match(postcode)
-        if outcode_match:
+        # Outcode only match
+        if found:
             if incode_mandatory:
-                raise exceptions.IncodeNotFoundError('Incode mandatory')
+                return '', '', exceptions.IncodeNotFoundError
             else:
-                return outcode_match.group(1), ''
+                return outcode, '', None
 
         # Try Girobank special case
         if postcode == 'GIR0AA':
-            return 'GIR', '0AA'
+            return 'GIR', '0AA', None
         elif postcode == 'GIR':
             if incode_mandatory:
-                raise exceptions.IncodeNotFoundError('Incode mandatory')
+                return '', '', exceptions.IncodeNotFoundError
             else:
-                return 'GIR', ''
+                return 'GIR', '', None
 
         # None of the above
-        raise exceptions.InvalidPostcodeError(
-            'Value provided does not align with UK postcode rules'
-        )
+        return '', '', exceptions.InvalidPostcodeError
 
     # Just chop up whatever we've been given.
     else:
         # Outcode only
         if len(postcode) <= 4:
             if incode_mandatory:
-                raise exceptions.IncodeNotFoundError('Incode mandatory')
+                return '', '', exceptions.IncodeNotFoundError
             else:
-                return postcode, ''
+                return postcode, '', None
         # Full postcode
         else:
-            return postcode[:-3], postcode[-3:]
+            return postcode[:-3], postcode[-3:], None
+
+
+def match_strict(postcode):
+    '''Match a normalised ASCII postcode against the strict rules.
+
+    A deterministic replacement for POSTCODE_REGEX and
+    STANDALONE_OUTCODE_REGEX, giving the same answers in a single left to
+    right pass. The outcode can only be one of two lengths once its first two
+    characters are known, and the regexs prefer the longer of the two, so
+    both readings are checked in that order instead of backtracking. Only
+    the small character class tables above are needed, so the first call
+    costs no more than any other.
+
+    Returns:            outcode, incode, found - found is true if either a
+                        full postcode or a standalone outcode matched. For a
+                        standalone outcode, incode is an empty string.
+    '''
+
+    length = len(postcode)
+    if length < 2:
+        return '', '', False
+
+    digits = DIGITS
+    first, second = postcode[0], postcode[1]
+    if first in ONE_CHAR_ZONES and second in digits:
+        shortest = 2
+        extra_class = THIRD_POS_CLASS
+    elif postcode[:2] in TWO_CHAR_ZONES and length > 2 and postcode[2] in digits:
+        shortest = 3
+        extra_class = FOURTH_POS_CLASS
+    elif postcode[:3] == 'BF1':  # special case for british forces postcodes
+        shortest = 3
+        extra_class = ()
+    else:
+        return '', '', False
+
+    # Try for full postcode match, then for outcode only match, preferring
+    # the longer outcode each time
+    incode_class = INCODE_CLASS
+    if length > shortest and postcode[shortest] in extra_class:
+        longest = shortest + 1
+        if length >= longest + 3 and postcode[longest] in digits and \
+                postcode[longest + 1] in incode_class and postcode[longest + 2] in incode_class:
+            return postcode[:longest], postcode[longest:longest + 3], True
+    else:
+        longest = shortest
+
+    if length >= shortest + 3 and postcode[shortest] in digits and \
+            postcode[shortest + 1] in incode_class and postcode[shortest + 2] in incode_class:
+        return postcode[:shortest], postcode[shortest:shortest + 3], True
+
+    for split in (longest, shortest):
+        rest = postcode[split:]
+        if not rest or rest.isspace():
+            return postcode[:split], '', True
+
+    return '', '', False
+
+
+def is_outcode(outcode):
+    '''Return true if outcode is a valid outcode in strict mode.
+
+    Arguments:
+    outcode             A normalised outcode - upper case, no whitespace.
+    '''
+
+    if outcode == 'GIR':
+        return True
+    if outcode.isascii():
+        matched, incode, found = match_strict(outcode)
+        return found and not incode and matched == outcode
+    return bool((_REGEXS or _regexs())[1].match(outcode))
+
+
+def _match_strict_regex(postcode):
+    '''Regex based equivalent of match_strict, for non-ASCII input.'''
+
+    postcode_regex, outcode_regex = _REGEXS or _regexs()
+    postcode_match = postcode_regex.match(postcode)
+    if postcode_match:
+        return postcode_match.group(1, 2) + (True,)
+
+    outcode_match = outcode_regex.match(postcode)
+    if outcode_match:
+        return outcode_match.group(1), '', True
+
+    return '', '', False
+
+
+# POSTCODE_REGEX and STANDALONE_OUTCODE_REGEX, once compiled
+_REGEXS = ()
+
+
+def _regexs():
+    '''Build the regex patterns and compile the regexs, once.
+
+    Importing the module stays cheap for processes that never parse, or
+    that only ever parse ASCII in strict mode, which doesn't use the
+    regexs. Anything else reading the patterns or regexs from the module
+    gets them through __getattr__, which calls this.
+
+    Returns:            POSTCODE_REGEX, STANDALONE_OUTCODE_REGEX
+    '''
+
+    global _REGEXS
+    if not _REGEXS:
+        import re
+
+        outcode_pattern = (r'(' +
+                           r'(?:(?:' +
+                           '|'.join(POSTAL_ZONES_ONE_CHAR) +
+                           r')(?:\d[' +
+                           ''.join(THIRD_POS_CHARS) +
+                           r']|\d{1,2}))' +
+                           r'|' +
+                           r'(?:(?:' +
+                           '|'.join(POSTAL_ZONES_TWO_CHARS) +
+                           r')(?:\d[' +
+                           ''.join(FOURTH_POS_CHARS) +
+                           r']|\d{1,2}))' +
+                           r'|(?:BF1)' +  # special case for british forces postcodes
+                           r')')
+        incode_pattern = (r'(\d[' +
+                          ''.join(INCODE_CHARS) +
+                          r'][' +
+                          ''.join(INCODE_CHARS) +
+                          r'])')
+        postcode_pattern = outcode_pattern + incode_pattern
+        standalone_outcode_pattern = outcode_pattern + r'\s*$'
+        regexs = (re.compile(postcode_pattern), re.compile(standalone_outcode_pattern))
+        globals().update(
+            OUTCODE_PATTERN=outcode_pattern,
+            INCODE_PATTERN=incode_pattern,
+            POSTCODE_PATTERN=postcode_pattern,
+            STANDALONE_OUTCODE_PATTERN=standalone_outcode_pattern,
+            POSTCODE_REGEX=regexs[0],
+            STANDALONE_OUTCODE_REGEX=regexs[1],
+        )
+        _REGEXS = regexs
+    return _REGEXS
+
+
+def __getattr__(name):
+    # Only called for names not yet set, which are built on first use
+    if name in _LAZY_NAMES:
+        _regexs()
+        return globals()[name]
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
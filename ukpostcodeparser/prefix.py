@@ -0,0 +1,177 @@
+'''Incremental validation of partly typed UK postcodes
+
+Provides PrefixValidator, which follows a postcode as it is typed a
+character at a time and says after each one whether it could still become a
+valid postcode.'''
+
+from ukpostcodeparser import grammar
+from ukpostcodeparser.result import Postcode
+
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+_GIROBANK_PREFIXES = frozenset(['', '0', '0A', '0AA'])
+
+
+class PrefixValidator(object):
+    '''Validate a postcode one character at a time.
+
+    Follows the same grammar as the strict parser. Whitespace is ignored and
+    letters may be in either case, as for parse_uk_postcode. Unlike
+    parse_uk_postcode, which ignores anything after a full postcode,
+    characters beyond a full postcode make the prefix invalid.
+
+    Each character costs a constant amount of work, however long the
+    prefix, and so does removing the last one.
+
+    Usage example:      >>> validator = PrefixValidator('sw1')
+                        >>> validator.viable, validator.is_outcode
+                        (True, True)
+                        >>> validator.feed('a 1a')
+                        True
+                        >>> sorted(validator.allowed_next())[:3]
+                        ['A', 'B', 'D']
+                        >>> validator.push('A')
+                        True
+                        >>> validator.postcode
+                        ('SW1A', '1AA')
+    '''
+
+    def __init__(self, prefix=''):
+        # The state after each character, so that pop is constant time.
+        # A state is the outcode typed so far, or None if it can no longer
+        # be an outcode, and a tuple of (outcode, incode) readings with the
+        # incode still being typed.
+        self._states = [('', ())]
+        self._chars = []
+        _tables()
+        self.feed(prefix)
+
+    def push(self, char):
+        '''Add one character, returning whether the prefix is still viable.
+
+        Whitespace is ignored.
+        '''
+
+        if not char.isspace():
+            char = char.upper()
+            self._states.append(_advance(self._states[-1], char))
+            self._chars.append(char)
+        return self.viable
+
+    def feed(self, chars):
+        '''Add each of chars in turn, returning whether still viable.'''
+
+        for char in chars:
+            self.push(char)
+        return self.viable
+
+    def pop(self):
+        '''Remove the last character added, other than whitespace.'''
+
+        if self._chars:
+            self._states.pop()
+            self._chars.pop()
+
+    def reset(self):
+        '''Start again from an empty prefix.'''
+
+        del self._states[1:]
+        del self._chars[:]
+
+    @property
+    def prefix(self):
+        '''The characters added so far, without whitespace, in upper case.'''
+
+        return ''.join(self._chars)
+
+    @property
+    def viable(self):
+        '''True if more characters could make a valid postcode.
+
+        Also true if the prefix is already a valid outcode or postcode.
+        '''
+
+        outcode, readings = self._states[-1]
+        return outcode is not None or bool(readings)
+
+    @property
+    def is_outcode(self):
+        '''True if the prefix is a complete, valid outcode.'''
+
+        outcode = self._states[-1][0]
+        return outcode is not None and (outcode in _TABLES['outcodes'] or outcode == 'GIR')
+
+    @property
+    def is_complete(self):
+        '''True if the prefix is a complete, valid postcode.'''
+
+        return self.postcode is not None
+
+    @property
+    def postcode(self):
+        '''The Postcode if the prefix is complete, otherwise None.'''
+
+        for outcode, incode in self._states[-1][1]:
+            if len(incode) == 3:
+                return Postcode(outcode, incode)
+        return None
+
+    def allowed_next(self):
+        '''Return the set of characters that would keep the prefix viable.
+
+        Only upper case letters and digits are listed.
+        '''
+
+        state = self._states[-1]
+        allowed = set()
+        for char in ALPHABET:
+            outcode, readings = _advance(state, char)
+            if outcode is not None or readings:
+                allowed.add(char)
+        return allowed
+
+
+def _advance(state, char):
+    '''Return the state following state once char is added.'''
+
+    outcode, readings = state
+    incode_prefixes = _TABLES['incode_prefixes']
+    advanced = []
+    for reading_outcode, incode in readings:
+        incode += char
+        prefixes = _GIROBANK_PREFIXES if reading_outcode == 'GIR' else incode_prefixes
+        if incode in prefixes:
+            advanced.append((reading_outcode, incode))
+
+    if outcode is not None:
+        outcode += char
+        if outcode not in _TABLES['outcode_prefixes']:
+            outcode = None
+        elif outcode in _TABLES['outcodes'] or outcode == 'GIR':
+            # A complete outcode, though a longer one may yet be typed
+            advanced.append((outcode, ''))
+    return outcode, tuple(advanced)
+
+
+_TABLES = {}
+
+
+def _tables():
+    '''Build, once, the sets of valid outcodes and prefixes.'''
+
+    if not _TABLES:
+        tables = grammar._tables()
+        _TABLES.update(
+            # Without GIR, which is checked for separately
+            outcodes=tables['outcodes'],
+            # Any prefix of an outcode longer than its area is itself an
+            # outcode, so only the areas need taking apart
+            outcode_prefixes=frozenset(tables['ordered']).union(
+                area[:end] for area in list(tables['areas']) + ['GIR']
+                for end in range(len(area) + 1)
+            ),
+            incode_prefixes=frozenset(
+                incode[:end] for incode in tables['incodes'] for end in range(4)
+            ),
+        )
+    return _TABLES
@@ -0,0 +1,118 @@
+'''Types for the results of parsing UK postcodes
+
+Provides Postcode, the value parse_uk_postcode returns, and ResultCode, a
+compact integer form of the outcome of parsing for use by the bulk APIs.'''
+
+from enum import IntEnum
+
+from ukpostcodeparser import exceptions
+
+
+# string.ascii_uppercase, without importing string
+_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+class Postcode(tuple):
+    '''A parsed postcode - an (outcode, incode) pair.
+
+    A tuple, so it unpacks and compares exactly as the bare tuples
+    parse_uk_postcode used to return, with no per instance dictionary. The
+    parts of the postcode are worked out from outcode and incode when asked
+    for, and not stored.
+
+    Usage example:      >>> postcode = Postcode('SW1A', '1AA')
+                        >>> outcode, incode = postcode
+                        >>> postcode.area, postcode.district, postcode.sector
+                        ('SW', 'SW1A', 'SW1A 1')
+                        >>> str(postcode)
+                        'SW1A 1AA'
+    '''
+
+    __slots__ = ()
+
+    def __new__(cls, outcode, incode=''):
+        return tuple.__new__(cls, (outcode, incode))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    def __str__(self):
+        return self.unit
+
+    @property
+    def outcode(self):
+        '''The outward code, e.g. 'SW1A'.'''
+        return self[0]
+
+    @property
+    def incode(self):
+        '''The inward code, e.g. '1AA'. Empty for an outcode on its own.'''
+        return self[1]
+
+    @property
+    def area(self):
+        '''The postcode area - the letters starting the outcode, e.g. 'SW'.'''
+        outcode = self[0]
+        return outcode[:len(outcode) - len(outcode.lstrip(_LETTERS))]
+
+    @property
+    def district(self):
+        '''The postcode district, which is the whole outcode, e.g. 'SW1A'.'''
+        return self[0]
+
+    @property
+    def sector(self):
+        '''The district and the first incode character, e.g. 'SW1A 1'.
+
+        Empty for an outcode on its own.
+        '''
+        incode = self[1]
+        return self[0] + ' ' + incode[0] if incode else ''
+
+    @property
+    def unit(self):
+        '''The whole postcode, e.g. 'SW1A 1AA'.
+
+        Just the outcode when there is no incode.
+        '''
+        outcode, incode = self
+        return outcode + ' ' + incode if incode else outcode
+
+
+class ResultCode(IntEnum):
+    '''Outcome of parsing a postcode, as a small integer.
+
+    VALID is zero, so any true value means parsing failed.
+    '''
+
+    VALID = 0
+    INVALID = 1
+    MAX_LENGTH_EXCEEDED = 2
+    INCODE_NOT_FOUND = 3
+
+    @property
+    def exception(self):
+        '''The exception class parse_uk_postcode raises for this outcome.
+
+        None for VALID.
+        '''
+        return _EXCEPTIONS[self]
+
+    @classmethod
+    def for_error(cls, error):
+        '''Return the code for an error from parse_uk_postcodes.
+
+        Arguments:
+        error               An exception class from
+                            ukpostcodeparser.exceptions, or None.
+        '''
+        return _CODES[error]
+
+
+_EXCEPTIONS = {
+    ResultCode.VALID: None,
+    ResultCode.INVALID: exceptions.InvalidPostcodeError,
+    ResultCode.MAX_LENGTH_EXCEEDED: exceptions.MaxLengthExceededError,
+    ResultCode.INCODE_NOT_FOUND: exceptions.IncodeNotFoundError,
+}
+_CODES = dict((error, code) for code, error in _EXCEPTIONS.items())
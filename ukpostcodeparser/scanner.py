@@ -0,0 +1,190 @@
+'''Finding UK postcodes in free text
+
+Provides find_uk_postcodes, which scans a document for postcodes in a
+single pass of one regex, rather than splitting it into tokens and parsing
+each of them, and scan_file, which does the same for a file of any size
+without reading it into memory.'''
+
+import mmap
+import os
+import re
+
+from ukpostcodeparser import parser
+
+
+# Most whitespace allowed between outcode and incode. Line breaks are not.
+MAX_GAP = 3
+
+
+def _zones_pattern(zones):
+    '''Return a pattern matching any of zones, grouped by first letter.
+
+    Grouping means a failed match costs one branch rather than one per
+    zone, which matters when a match is attempted at every position.
+    '''
+
+    by_first = {}
+    for zone in zones:
+        by_first.setdefault(zone[0], []).append(zone[1:])
+    branches = []
+    for first, rests in sorted(by_first.items()):
+        if rests == ['']:
+            branches.append(first)
+        else:
+            branches.append(first + '[' + ''.join(sorted(rests)) + ']')
+    return '(?:' + '|'.join(branches) + ')'
+
+
+def _scan_pattern(gap):
+    '''Return SCAN_PATTERN, with gap matching one whitespace character.'''
+
+    # The strict grammar of OUTCODE_PATTERN and INCODE_PATTERN, with ASCII
+    # digits, whitespace allowed between the two, and word boundaries
+    # either side. GIR is allowed with any incode here, and filtered
+    # afterwards.
+    return (r'(?<![A-Za-z0-9])' +
+            r'(?P<outcode>' +
+            '[' + ''.join(parser.POSTAL_ZONES_ONE_CHAR) + ']' +
+            r'(?:[0-9][' + ''.join(parser.THIRD_POS_CHARS) + r']|[0-9]{1,2})' +
+            r'|' +
+            _zones_pattern(parser.POSTAL_ZONES_TWO_CHARS) +
+            r'(?:[0-9][' + ''.join(parser.FOURTH_POS_CHARS) + r']|[0-9]{1,2})' +
+            r'|BF1|GIR' +
+            r')' +
+            gap + r'{0,' + str(MAX_GAP) + r'}' +
+            r'(?P<incode>[0-9][' +
+            ''.join(parser.INCODE_CHARS) +
+            r'][' +
+            ''.join(parser.INCODE_CHARS) +
+            r'])' +
+            r'(?![A-Za-z0-9])')
+
+
+SCAN_PATTERN = _scan_pattern(r'[^\S\r\n]')
+
+# ASCII, so that ignoring case only lets letters match their own upper or
+# lower case - the Kelvin sign is not a K, as parse_uk_postcode agrees. The
+# gap is left to match any whitespace, as parse_uk_postcode allows.
+SCAN_REGEX = re.compile(_scan_pattern(r'(?u:[^\S\r\n])'), re.IGNORECASE | re.ASCII)
+SCAN_BYTES_REGEX = re.compile(SCAN_PATTERN.encode('ascii'), re.IGNORECASE)
+
+# Longest a match can be, plus a character for the check after it
+_OVERLAP = 4 + MAX_GAP + 3 + 1
+
+
+def find_uk_postcodes(text, pos=0, endpos=None):
+    '''Find every UK postcode in text.
+
+    Arguments:
+    text                The text to be searched.
+    pos                 Where in text to start searching.
+    endpos              Where in text to stop searching; the end by default.
+
+    Yields:             start, end, outcode, incode - for each postcode,
+                        where it starts and ends in text, along with its
+                        outcode and incode in upper case, just as
+                        parse_uk_postcode would return them.
+
+    Usage example:      >>> list(find_uk_postcodes('Send to 10 Downing St, SW1A 2AA.'))
+                        [(23, 31, 'SW1A', '2AA')]
+    '''
+
+    if endpos is None:
+        endpos = len(text)
+    for match in SCAN_REGEX.finditer(text, pos, endpos):
+        outcode, incode = match.group('outcode', 'incode')
+        outcode = outcode.upper()
+        incode = incode.upper()
+        if outcode == 'GIR' and incode != '0AA':
+            continue
+        yield match.start(), match.end(), outcode, incode
+
+
+def find_uk_postcodes_in_bytes(buffer, pos=0, endpos=None):
+    '''Find every UK postcode in a bytes-like object, without decoding it.
+
+    As for find_uk_postcodes, except that buffer may be bytes, bytearray,
+    memoryview or mmap, and start and end are byte offsets. Only ASCII
+    whitespace is allowed between outcode and incode.
+    '''
+
+    if endpos is None:
+        endpos = len(buffer)
+    for match in SCAN_BYTES_REGEX.finditer(buffer, pos, endpos):
+        outcode, incode = match.group('outcode', 'incode')
+        outcode = outcode.decode('ascii').upper()
+        incode = incode.decode('ascii').upper()
+        if outcode == 'GIR' and incode != '0AA':
+            continue
+        yield match.start(), match.end(), outcode, incode
+
+
+def scan_file(path, workers=None, region_size=64 * 1024 * 1024):
+    '''Find every UK postcode in a file, which is memory mapped.
+
+    The file is scanned as bytes, so it is never decoded or copied into
+    memory as a whole. Any ASCII compatible encoding, such as UTF-8 or
+    Latin-1, can be scanned.
+
+    Arguments:
+    path                The file to be scanned.
+    workers             If more than one, scan regions of the file in a
+                        pool of this many processes. Each maps the file
+                        itself, so only the postcodes found are passed
+                        between processes.
+    region_size         With workers, the number of bytes scanned by a
+                        process at a time.
+
+    Yields:             start, end, outcode, incode - as for
+                        find_uk_postcodes_in_bytes, in file order.
+    '''
+
+    size = os.path.getsize(path)
+    if not size:
+        return
+
+    if workers is None or workers < 2:
+        for result in _scan_region(path, 0, size):
+            yield result
+        return
+
+    import multiprocessing
+
+    regions = [(path, start, min(start + region_size, size))
+               for start in range(0, size, region_size)]
+    pool = multiprocessing.Pool(workers)
+    try:
+        for results in pool.imap(_scan_region_list, regions):
+            for result in results:
+                yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _scan_region(path, start, stop):
+    '''Yield the postcodes that start from start up to stop in a file.
+
+    A postcode cannot start part way through another one, so scanning a
+    little past stop finds the same postcodes as scanning the whole file.
+    '''
+
+    with open(path, 'rb') as stream:
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        results = find_uk_postcodes_in_bytes(
+            mapped, start, min(stop + _OVERLAP, len(mapped))
+        )
+        try:
+            for result in results:
+                if result[0] >= stop:
+                    break
+                yield result
+        finally:
+            # Release the regex's hold on the map before closing it
+            results.close()
+            mapped.close()
+
+
+def _scan_region_list(region):
+    return list(_scan_region(*region))
@@ -0,0 +1,330 @@
+'''HTTP service for UK postcode parsing
+
+Serves parse_uk_postcode over HTTP from a long running process, so that
+callers in other languages pay for starting Python once rather than on
+every call. Run with
+python -m ukpostcodeparser serve --help for usage.
+
+Endpoints:
+GET  /parse?postcode=cr0+2yr     One postcode. POST also accepts a JSON
+                                 object with a "postcode" member.
+POST /parse/bulk                 A JSON array of postcodes, or with a
+                                 Content-Type of application/x-ndjson, one
+                                 JSON string per line. Results are streamed
+                                 back in the same format, in order.
+
+Both take optional strict and incode_mandatory query parameters, true by
+default, as for parse_uk_postcode. Each result is an object with the
+postcode as given, its outcode and incode, and the reason, as written by
+the command line interface - 'valid', or why not.
+
+Connections are kept alive between requests, and with more than one worker
+each is a process forked from the first, all accepting on the one socket.'''
+
+import argparse
+import json
+import os
+import signal
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from itertools import islice
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlsplit
+
+from ukpostcodeparser import exceptions, parser
+from ukpostcodeparser.cli import REASONS
+
+
+# Results written to a bulk response at a time
+BULK_CHUNK_SIZE = 1000
+# Largest request body accepted, other than NDJSON, which is streamed
+MAX_BODY_SIZE = 64 * 1024 * 1024
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson')
+
+
+def result_object(postcode, result):
+    '''Return the JSON object for a result of parser._parse.'''
+
+    outcode, incode, error = result
+    return {'postcode': postcode, 'outcode': outcode, 'incode': incode,
+            'reason': REASONS[error]}
+
+
+class PostcodeServer(ThreadingMixIn, HTTPServer):
+    '''HTTP server for PostcodeRequestHandler, a thread per connection.'''
+
+    allow_reuse_address = True
+    daemon_threads = True
+    access_log = False
+
+
+class PostcodeRequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ukpostcodeparser'
+    # Seconds an idle kept alive connection is held open
+    timeout = 60
+    # Headers and body are written separately, which with Nagle's algorithm
+    # would wait on the client's delayed ACK every request
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != '/parse':
+            return self._send_error(404, 'Not found')
+        query = parse_qs(url.query)
+        if 'postcode' not in query:
+            return self._send_error(400, 'Missing postcode parameter')
+        self._parse_one(query['postcode'][0], query)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/parse':
+            body = self._read_json()
+            if body is None:
+                return
+            if not isinstance(body, dict) or not isinstance(body.get('postcode'), str):
+                return self._send_error(400, 'Expected an object with a postcode string')
+            self._parse_one(body['postcode'], query)
+        elif url.path == '/parse/bulk':
+            self._parse_bulk(query)
+        else:
+            self._send_error(404, 'Not found')
+
+    def _parse_one(self, postcode, query):
+        options = self._options(query)
+        if options is not None:
+            self._send_json(200, result_object(postcode, parser._parse(postcode, *options)))
+
+    def _parse_bulk(self, query):
+        options = self._options(query)
+        if options is None:
+            return
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+        ndjson = content_type in NDJSON_TYPES
+        if ndjson:
+            length = self._content_length()
+            if length is None:
+                return
+            postcodes = self._ndjson_lines(length)
+        else:
+            postcodes = self._read_json()
+            if postcodes is None:
+                return
+            if not isinstance(postcodes, list) or not all(
+                    isinstance(postcode, str) for postcode in postcodes):
+                return self._send_error(400, 'Expected an array of postcode strings')
+            content_type = 'application/json'
+
+        encoded = (json.dumps(self._result(postcode, options)) for postcode in postcodes)
+        if ndjson:
+            pieces = (text + '\n' for text in encoded)
+        else:
+            pieces = _json_array(encoded)
+
+        # HTTP/1.0 clients get the response unchunked, ended by closing
+        chunked = self.request_version != 'HTTP/1.0'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        for chunk in iter(lambda: list(islice(pieces, BULK_CHUNK_SIZE)), []):
+            self._write_body(''.join(chunk).encode('utf-8'), chunked)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+    def _result(self, postcode, options):
+        if isinstance(postcode, str):
+            return result_object(postcode, parser._parse(postcode, *options))
+        # Only possible in NDJSON, once the response has started
+        return result_object(postcode, ('', '', exceptions.InvalidPostcodeError))
+
+    def _ndjson_lines(self, length):
+        '''Yield the value on each line of an NDJSON body, as it arrives.
+
+        A line that is not JSON is taken to be a bare postcode.
+        '''
+
+        while length > 0:
+            line = self.rfile.readline(min(length, 65536))
+            if not line:
+                break
+            length -= len(line)
+            while not line.endswith(b'\n') and length > 0:
+                # Longer than any postcode, so only read the rest of it
+                rest = self.rfile.readline(min(length, 65536))
+                if not rest:
+                    break
+                length -= len(rest)
+                line += rest
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield line.decode('utf-8', 'replace')
+
+    def _options(self, query):
+        '''Return strict, incode_mandatory from the query, or send an error.'''
+
+        options = []
+        for name in ('strict', 'incode_mandatory'):
+            value = query.get(name, ['true'])[0].lower()
+            if value in ('1', 'true', 'yes'):
+                options.append(True)
+            elif value in ('0', 'false', 'no'):
+                options.append(False)
+            else:
+                self._send_error(400, 'Bad value for {}'.format(name))
+                return None
+        return options
+
+    def _content_length(self):
+        try:
+            length = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            self._send_error(411, 'Content-Length required')
+            return None
+        if length < 0:
+            self._send_error(400, 'Bad Content-Length')
+            return None
+        return length
+
+    def _read_json(self):
+        '''Return the decoded JSON body, or send an error and return None.'''
+
+        length = self._content_length()
+        if length is None:
+            return None
+        if length > MAX_BODY_SIZE:
+            self._send_error(413, 'Request body too large')
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            self._send_error(400, 'Request body is not valid JSON')
+            return None
+
+    def _write_body(self, data, chunked):
+        if chunked:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        else:
+            self.wfile.write(data)
+
+    def _send_json(self, status, value):
+        body = json.dumps(value).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        if self.command == 'POST':
+            # Any body left unread would be taken for the next request
+            self.close_connection = True
+        self._send_json(status, {'error': message})
+
+    def log_message(self, format, *args):
+        if self.server.access_log:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+def make_server(host='127.0.0.1', port=8080):
+    '''Return a PostcodeServer listening on host and port, ready to serve.
+
+    Everything the parser builds when first used is built now, so that no
+    request pays for it, and so that forked workers share it.
+    '''
+
+    parser._regexs()
+    return PostcodeServer((host, port), PostcodeRequestHandler)
+
+
+def serve(server, workers=1):
+    '''Serve requests until interrupted, in this many processes.'''
+
+    if workers <= 1 or not hasattr(os, 'fork'):
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    # A worker that loses the race to accept a connection goes back to
+    # waiting, rather than blocking in accept
+    server.socket.setblocking(False)
+    children = []
+    try:
+        for _ in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                try:
+                    server.serve_forever()
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ChildProcessError, ProcessLookupError):
+                pass
+        server.server_close()
+
+
+def _json_array(items):
+    '''Yield the pieces of a JSON array of the already encoded items.'''
+
+    yield '['
+    for index, item in enumerate(items):
+        yield ',' + item if index else item
+    yield ']'
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog='python -m ukpostcodeparser serve',
+        description='Serve UK postcode parsing over HTTP.',
+    )
+    argument_parser.add_argument(
+        '--host', default='127.0.0.1',
+        help='address to listen on (default 127.0.0.1)')
+    argument_parser.add_argument(
+        '-p', '--port', type=int, default=8080,
+        help='port to listen on, or 0 for any free port (default 8080)')
+    argument_parser.add_argument(
+        '-w', '--workers', type=int, default=os.cpu_count() or 1,
+        help='number of processes to serve from (default one per CPU)')
+    argument_parser.add_argument(
+        '--access-log', action='store_true',
+        help='log each request to standard error')
+    args = argument_parser.parse_args(argv)
+
+    server = make_server(args.host, args.port)
+    server.access_log = args.access_log
+    host, port = server.server_address[:2]
+    print('Serving on http://{}:{}/ with {} workers'.format(host, port, args.workers))
+    sys.stdout.flush()
+    serve(server, args.workers)
+    return 0
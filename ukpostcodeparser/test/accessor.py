@@ -0,0 +1,53 @@
+import unittest
+
+try:
+    import pandas
+    import ukpostcodeparser.accessor  # noqa: F401 - registers the accessor
+except ImportError:
+    pandas = None
+
+
+@unittest.skipIf(pandas is None, 'pandas is not installed')
+class PostcodeAccessorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.series = pandas.Series(
+            ['cr0 2yr', 'SW1A 1AA', 'n16', 'xx0 2yr', None],
+            index=list('abcde'), name='postcode'
+        )
+
+    def test_properties(self):
+        accessor = self.series.ukpostcode
+        self.assertEqual(accessor.outcode.tolist()[:2], ['CR0', 'SW1A'])
+        self.assertEqual(accessor.incode.tolist()[:2], ['2YR', '1AA'])
+        self.assertEqual(accessor.area.tolist()[:2], ['CR', 'SW'])
+        self.assertEqual(accessor.is_valid.tolist(), [True, True, False, False, False])
+        self.assertTrue(accessor.outcode[2:].isna().all())
+
+    def test_properties_keep_index_and_name(self):
+        outcodes = self.series.ukpostcode.outcode
+        self.assertEqual(outcodes.index.tolist(), list('abcde'))
+        self.assertEqual(outcodes.name, 'postcode')
+
+    def test_parse(self):
+        frame = self.series.ukpostcode.parse(strict=True, incode_mandatory=False)
+        self.assertEqual(frame.columns.tolist(), ['outcode', 'incode', 'area', 'valid'])
+        self.assertEqual(frame.loc['c', 'outcode'], 'N16')
+        self.assertEqual(frame.loc['c', 'incode'], '')
+        self.assertEqual(frame['valid'].tolist(), [True, True, True, False, False])
+
+    def test_parse_non_strict(self):
+        frame = self.series.ukpostcode.parse(strict=False)
+        self.assertEqual(frame.loc['d', 'outcode'], 'XX0')
+        self.assertEqual(frame.loc['d', 'area'], 'XX')
+
+    def test_properties_follow_changes(self):
+        series = pandas.Series(['cr0 2yr', 'xx0'])
+        self.assertEqual(series.ukpostcode.is_valid.tolist(), [True, False])
+        series[1] = 'sw1a 1aa'
+        self.assertEqual(series.ukpostcode.outcode.tolist(), ['CR0', 'SW1A'])
+
+    def test_long_values(self):
+        for dtype in (object, 'string'):
+            series = pandas.Series(['cr0 2yr', 'x' * 600, 'cr0' + ' ' * 30 + '2yr'], dtype=dtype)
+            self.assertEqual(series.ukpostcode.is_valid.tolist(), [True, False, True])
@@ -0,0 +1,92 @@
+import unittest
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ukpostcodeparser import parse_uk_postcodes
+from ukpostcodeparser.aio import AsyncPostcodeParser
+from ukpostcodeparser.exceptions import IncodeNotFoundError, InvalidPostcodeError
+
+
+POSTCODES = ['cr0 2yr', 'SW1A 1AA', 'xx0 2yr', 'n16', 'x' * 20] * 500
+
+
+class AsyncPostcodeParserTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def parse_all(self, parse):
+        return await asyncio.gather(*[parse.parse(postcode) for postcode in POSTCODES])
+
+    async def test_results_match_batch_parsing(self):
+        parse = AsyncPostcodeParser(max_batch_size=300)
+        self.assertEqual(await self.parse_all(parse), list(parse_uk_postcodes(POSTCODES)))
+
+    async def test_call_raises(self):
+        parse = AsyncPostcodeParser()
+        self.assertEqual(await parse('cr0 2yr'), ('CR0', '2YR'))
+        with self.assertRaises(InvalidPostcodeError):
+            await parse('xx0 2yr')
+        with self.assertRaises(IncodeNotFoundError):
+            await parse('cr0')
+        self.assertEqual(await AsyncPostcodeParser(incode_mandatory=False)('cr0'), ('CR0', ''))
+
+    async def test_full_batch_does_not_wait(self):
+        parse = AsyncPostcodeParser(max_batch_size=2, max_delay=60)
+        results = await asyncio.wait_for(
+            asyncio.gather(parse('cr0 2yr'), parse('n16 8qs')), timeout=5
+        )
+        self.assertEqual(results, [('CR0', '2YR'), ('N16', '8QS')])
+
+    async def test_bad_postcode_fails_only_its_caller(self):
+        # Refused without joining the batch, which fills with the other two
+        parse = AsyncPostcodeParser(max_batch_size=2, max_delay=60)
+        results = await asyncio.wait_for(asyncio.gather(
+            parse.parse('cr0 2yr'), parse.parse(None), parse.parse('sw1a 1aa'),
+            return_exceptions=True
+        ), timeout=5)
+        self.assertEqual(results[0], ('CR0', '2YR', None))
+        self.assertIsInstance(results[1], TypeError)
+        self.assertEqual(results[2], ('SW1A', '1AA', None))
+
+        # A str that fails while its batch is parsed
+        parse = AsyncPostcodeParser(max_batch_size=3, max_delay=60)
+        results = await asyncio.wait_for(asyncio.gather(
+            parse('cr0 2yr'), parse(_Failing('n16 8qs')), parse('sw1a 1aa'),
+            return_exceptions=True
+        ), timeout=5)
+        self.assertEqual(results[0], ('CR0', '2YR'))
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(results[2], ('SW1A', '1AA'))
+
+    async def test_cancelled_caller(self):
+        parse = AsyncPostcodeParser(max_delay=0.01)
+        abandoned = parse.parse('cr0 2yr')
+        abandoned.cancel()
+        self.assertEqual(await parse('n16 8qs'), ('N16', '8QS'))
+
+    async def test_thread_executor(self):
+        with ThreadPoolExecutor(2) as executor:
+            async with AsyncPostcodeParser(max_batch_size=300, executor=executor) as parse:
+                results = await self.parse_all(parse)
+        self.assertEqual(results, list(parse_uk_postcodes(POSTCODES)))
+
+    async def test_process_executor(self):
+        with ProcessPoolExecutor(1) as executor:
+            parse = AsyncPostcodeParser(max_batch_size=1000, executor=executor)
+            results = await self.parse_all(parse)
+            await parse.aclose()
+        self.assertEqual(results, list(parse_uk_postcodes(POSTCODES)))
+
+    async def test_aclose_flushes(self):
+        parse = AsyncPostcodeParser(max_delay=60)
+        pending = parse.parse('cr0 2yr')
+        await parse.aclose()
+        self.assertEqual(pending.result(), ('CR0', '2YR', None))
+
+    def test_bad_batch_size(self):
+        with self.assertRaises(ValueError):
+            AsyncPostcodeParser(max_batch_size=0)
+
+
+class _Failing(str):
+
+    def replace(self, *args):
+        raise RuntimeError('replace failed')
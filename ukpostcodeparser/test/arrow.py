@@ -0,0 +1,69 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from ukpostcodeparser import parse_uk_postcodes, vectorized
+from ukpostcodeparser.result import ResultCode
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    from ukpostcodeparser.arrow import RESULT_TYPE, iter_parquet, parse_arrow
+except ImportError:
+    pyarrow = None
+
+
+POSTCODES = ['cr0 2yr', 'CR0', 'xx0 2yr', '  n16\t8qs ', 'sw1a 1aax', 'gir 0aa', '',
+             'n\u0661\u0666 8qs', 'caf\u00e9', 'sw1a 1aa' + ' ' * 40, 'x' * 100]
+
+
+def expected(postcodes, *args):
+    return [{'outcode': outcode, 'incode': incode, 'status': ResultCode.for_error(error)}
+            for outcode, incode, error in parse_uk_postcodes(postcodes, *args)]
+
+
+@unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+class ParseArrowTestCase(unittest.TestCase):
+
+    def test_matches_parse_uk_postcodes(self):
+        for args in [(), (False,), (True, False), (False, False)]:
+            result = parse_arrow(pyarrow.array(POSTCODES), *args)
+            self.assertEqual(result.type, RESULT_TYPE)
+            self.assertEqual(result.to_pylist(), expected(POSTCODES, *args), args)
+
+    def test_long_rows(self):
+        self.assertGreater(len(POSTCODES[-2]), vectorized.MAX_WIDTH)
+        self.assertEqual(parse_arrow(pyarrow.array(POSTCODES[-2:])).to_pylist(),
+                         expected(POSTCODES[-2:]))
+
+    def test_nulls_slices_and_types(self):
+        array = pyarrow.array([None, 'x', 'cr0 2yr', None, 'n16 8qs'])
+        result = parse_arrow(array)
+        self.assertEqual(result.to_pylist()[0], None)
+        self.assertEqual(result.to_pylist()[2]['outcode'], 'CR0')
+        self.assertEqual(parse_arrow(array.slice(2, 3)).to_pylist(), result.to_pylist()[2:])
+        large = parse_arrow(array.cast(pyarrow.large_string()))
+        self.assertEqual(large.to_pylist(), result.to_pylist())
+        self.assertEqual(parse_arrow(pyarrow.array([], pyarrow.string())).to_pylist(), [])
+        self.assertEqual(parse_arrow(pyarrow.array([None, None], pyarrow.string())).to_pylist(),
+                         [None, None])
+
+    def test_chunked(self):
+        chunked = pyarrow.chunked_array([POSTCODES[:4], POSTCODES[4:]])
+        result = parse_arrow(chunked)
+        self.assertEqual(result.num_chunks, 2)
+        self.assertEqual(result.to_pylist(), expected(POSTCODES))
+
+    def test_parquet(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'postcodes.parquet')
+            table = pyarrow.table({'id': list(range(len(POSTCODES))), 'postcode': POSTCODES})
+            pyarrow.parquet.write_table(table, path)
+            batches = list(iter_parquet(path, 'postcode', batch_size=4))
+            self.assertEqual(len(batches), 3)
+            results = [row for batch in batches for row in batch.to_pylist()]
+            self.assertEqual(results, expected(POSTCODES))
+        finally:
+            shutil.rmtree(directory)
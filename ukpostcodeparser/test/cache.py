@@ -0,0 +1,73 @@
+import unittest
+import threading
+
+from ukpostcodeparser.cache import CachedPostcodeParser
+from ukpostcodeparser.exceptions import (
+    InvalidPostcodeError, MaxLengthExceededError, IncodeNotFoundError
+)
+
+
+class CachedPostcodeParserTestCase(unittest.TestCase):
+
+    def test_results_match_parser(self):
+        parse = CachedPostcodeParser()
+        for _ in range(2):
+            self.assertEqual(parse('cr0 2yr'), ('CR0', '2YR'))
+            self.assertEqual(parse('cr0', True, False), ('CR0', ''))
+            self.assertEqual(parse('xx0 2yr', False), ('XX0', '2YR'))
+
+    def test_cached_failures_raise_original_exception(self):
+        parse = CachedPostcodeParser()
+        for _ in range(2):
+            self.assertRaises(IncodeNotFoundError, parse, 'cr0')
+            self.assertRaises(InvalidPostcodeError, parse, 'xx0 2yr')
+        self.assertEqual(parse.cache_info().hits, 2)
+
+    def test_flags_are_part_of_key(self):
+        parse = CachedPostcodeParser()
+        parse('cr0', True, False)
+        self.assertRaises(IncodeNotFoundError, parse, 'cr0', True, True)
+        self.assertEqual(parse.cache_info().misses, 2)
+
+    def test_over_length_values_not_cached(self):
+        parse = CachedPostcodeParser()
+        self.assertRaises(MaxLengthExceededError, parse, 'x' * 1000)
+        self.assertEqual(parse.cache_info().currsize, 0)
+
+    def test_least_recently_used_evicted(self):
+        parse = CachedPostcodeParser(maxsize=2)
+        parse('cr0 2yr')
+        parse('n16 8qs')
+        parse('cr0 2yr')
+        parse('sw1a 1aa')
+        parse('cr0 2yr')
+        self.assertEqual(parse.cache_info(), (2, 3, 1, 2, 2))
+        parse.cache_clear()
+        self.assertEqual(parse.cache_info(), (0, 0, 0, 2, 0))
+
+    def test_invalid_maxsize(self):
+        self.assertRaises(ValueError, CachedPostcodeParser, 0)
+
+    def test_thread_safety(self):
+        parse = CachedPostcodeParser(maxsize=10)
+        postcodes = ['cr0 2yr', 'n16 8qs', 'xx0 2yr', 'sw1a 1aa'] * 5
+        postcodes += ['e1 {}aa'.format(i) for i in range(10)]
+        errors = []
+
+        def work():
+            try:
+                for postcode in postcodes * 50:
+                    parse.parse(postcode)
+            except Exception as e:  # pragma: no cover - only on failure
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        info = parse.cache_info()
+        self.assertEqual(info.hits + info.misses, 8 * 50 * len(postcodes))
+        self.assertLessEqual(info.currsize, 10)
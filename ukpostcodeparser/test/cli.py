@@ -0,0 +1,78 @@
+import unittest
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+from ukpostcodeparser.cli import main
+
+
+class CommandLineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, 'output.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_main(self, content, *args):
+        path = os.path.join(self.directory, 'input.csv')
+        with io.open(path, 'w', newline='') as stream:
+            stream.write(content)
+        self.assertEqual(main([path, '-o', self.output] + list(args)), 0)
+        with io.open(self.output, newline='') as stream:
+            return stream.read().splitlines()
+
+    def test_csv_column_by_name(self):
+        lines = self.run_main(
+            'id,postcode\n1,cr0 2yr\n2,n16\n3,xx0 2yr\n4,n16 8qsss\n',
+            '--column', 'postcode', '--chunk-size', '2'
+        )
+        self.assertEqual(lines, [
+            'id,postcode,outcode,incode,reason',
+            '1,cr0 2yr,CR0,2YR,valid',
+            '2,n16,,,incode_not_found',
+            '3,xx0 2yr,,,invalid',
+            '4,n16 8qsss,,,max_length_exceeded',
+        ])
+
+    def test_csv_without_header(self):
+        lines = self.run_main(
+            'a;cr0\n', '--no-header', '--column', '1', '--delimiter', ';', '--incode-optional'
+        )
+        self.assertEqual(lines, ['a;cr0;CR0;;valid'])
+
+    def test_lines(self):
+        lines = self.run_main('cr0 2yr\r\nxx0 2yr\n', '--lines', '--non-strict')
+        self.assertEqual(lines, [
+            'postcode,outcode,incode,reason',
+            'cr0 2yr,CR0,2YR,valid',
+            'xx0 2yr,XX0,2YR,valid',
+        ])
+
+    def test_workers(self):
+        content = 'postcode\n' + 'cr0 2yr\nn16\n' * 50
+        lines = self.run_main(content, '--workers', '2', '--chunk-size', '7')
+        self.assertEqual(lines, self.run_main(content))
+        self.assertEqual(len(lines), 101)
+
+    def test_short_rows(self):
+        lines = self.run_main('id,postcode\n1\n', '--column', 'postcode')
+        self.assertEqual(lines[1], '1,,,invalid')
+
+    def test_files_that_cannot_be_opened(self):
+        missing = os.path.join(self.directory, 'missing', 'file.csv')
+        path = os.path.join(self.directory, 'input.csv')
+        with io.open(path, 'w') as stream:
+            stream.write('cr0 2yr\n')
+        for argv in ([missing, '-o', self.output], [path, '-o', missing]):
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as raised:
+                main(argv + ['--lines'])
+            self.assertEqual(raised.exception.code, 2)
+            self.assertIn("can't open", stderr.getvalue())
+
+    def test_unknown_column(self):
+        self.assertRaises(SystemExit, self.run_main, 'id\n1\n', '--column', 'postcode')
@@ -0,0 +1,57 @@
+import unittest
+import random
+
+from ukpostcodeparser.codec import decode_postcode, encode_postcode, prefix_range
+from ukpostcodeparser.exceptions import InvalidPostcodeError, IncodeNotFoundError
+from ukpostcodeparser.grammar import iter_outcodes
+
+
+class CodecTestCase(unittest.TestCase):
+
+    def test_round_trip(self):
+        rng = random.Random(11)
+        outcodes = list(iter_outcodes())
+        for _ in range(2000):
+            outcode = rng.choice(outcodes)
+            if outcode == 'GIR':
+                continue
+            postcode = '{} {}{}{}'.format(outcode, rng.randint(0, 9),
+                                          rng.choice('ABDZ'), rng.choice('ABDZ'))
+            self.assertEqual(' '.join(decode_postcode(encode_postcode(postcode))), postcode)
+
+    def test_fits_in_32_bits(self):
+        self.assertEqual(encode_postcode('AB0 0AA'), 0)
+        last = list(iter_outcodes())[-1] + ' 9ZZ'
+        self.assertLess(encode_postcode(last), 2 ** 32)
+        self.assertRaises(ValueError, decode_postcode, encode_postcode(last) + 1)
+        self.assertRaises(ValueError, decode_postcode, -1)
+
+    def test_order(self):
+        postcodes = ['SW1 1AA', 'SW1A 0AA', 'SW1A 1AA', 'SW1A 1AB', 'SW1A 2AA',
+                     'SW2 1AA', 'SW10 1AA', 'SY1 1AA']
+        codes = [encode_postcode(postcode) for postcode in postcodes]
+        self.assertEqual(codes, sorted(codes))
+
+    def test_accepts_tuples(self):
+        self.assertEqual(encode_postcode(('CR0', '2YR')), encode_postcode('cr0 2yr'))
+
+    def test_special_cases(self):
+        self.assertEqual(decode_postcode(encode_postcode('GIR 0AA')), ('GIR', '0AA'))
+        self.assertEqual(decode_postcode(encode_postcode('BF1 1AA')), ('BF1', '1AA'))
+        self.assertRaises(ValueError, decode_postcode, encode_postcode('GIR 0AA') + 1)
+
+    def test_invalid(self):
+        self.assertRaises(InvalidPostcodeError, encode_postcode, 'XX0 2YR')
+        self.assertRaises(IncodeNotFoundError, encode_postcode, 'CR0')
+        self.assertRaises(InvalidPostcodeError, encode_postcode, ('CR0', ''))
+        self.assertRaises(InvalidPostcodeError, encode_postcode, ('GIR', '1AA'))
+
+    def test_prefix_range(self):
+        code = encode_postcode('SW1A 1AA')
+        for prefix in ['SW', 'sw1a', 'SW1A 1']:
+            start, stop = prefix_range(prefix)
+            self.assertTrue(start <= code < stop, prefix)
+        self.assertEqual(prefix_range('SW1A 1')[1] - prefix_range('SW1A 1')[0], 400)
+        self.assertGreaterEqual(encode_postcode('SY1 1AA'), prefix_range('SW')[1])
+        self.assertEqual(prefix_range('XX'), (0, 0))
+        self.assertEqual(prefix_range('SW1A X'), (0, 0))
@@ -0,0 +1,49 @@
+import unittest
+import random
+
+from ukpostcodeparser.correction import CONFUSIONS, correct_uk_postcode
+from ukpostcodeparser.parser import parse_uk_postcode
+
+
+class CorrectionTestCase(unittest.TestCase):
+
+    def test_valid_postcode_comes_first(self):
+        self.assertEqual(correct_uk_postcode('sw1a1aa')[0], ('SW1A', '1AA'))
+        self.assertEqual(correct_uk_postcode('SW1A 1AA', max_edits=0), [('SW1A', '1AA')])
+
+    def test_confusions(self):
+        self.assertEqual(correct_uk_postcode('CRO 2YR'), [('CR0', '2YR')])
+        self.assertEqual(correct_uk_postcode('EC1A 188'), [])
+        self.assertEqual(correct_uk_postcode('EC1A 188', max_edits=2), [('EC1A', '1BB')])
+
+    def test_transposition(self):
+        self.assertEqual(correct_uk_postcode('C0R 2YR'), [('CR0', '2YR')])
+        self.assertEqual(correct_uk_postcode('N16 Q8S'), [('N16', '8QS')])
+
+    def test_misplaced_space(self):
+        self.assertEqual(correct_uk_postcode('CR02 YR', max_edits=0), [('CR0', '2YR')])
+
+    def test_ranking(self):
+        candidates = correct_uk_postcode('cr02yr')
+        self.assertEqual(candidates[0], ('CR0', '2YR'))
+        self.assertEqual(candidates[1:], sorted(candidates[1:]))
+
+    def test_hopeless(self):
+        for value in ['', 'xxxxx', 'SW1A 1AAA', 'Q', 'CR0 2YR extra']:
+            self.assertEqual(correct_uk_postcode(value, max_edits=2), [], value)
+        with self.assertRaises(ValueError):
+            correct_uk_postcode('CR0 2YR', max_edits=-1)
+
+    def test_recovers_random_confusions(self):
+        rng = random.Random(16)
+        postcodes = ['SW1A 1AA', 'EC1A 1BB', 'B33 8TH', 'CR2 6XH', 'DN55 1PT', 'BS98 1TL']
+        for _ in range(200):
+            postcode = rng.choice(postcodes)
+            confusable = [index for index, char in enumerate(postcode) if char in CONFUSIONS]
+            index = rng.choice(confusable)
+            misread = postcode[:index] + CONFUSIONS[postcode[index]] + postcode[index + 1:]
+            candidates = correct_uk_postcode(misread)
+            self.assertIn(parse_uk_postcode(postcode), candidates, misread)
+            for candidate in candidates:
+                self.assertEqual(parse_uk_postcode(' '.join(candidate)), candidate)
+
@@ -0,0 +1,148 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+from itertools import islice
+
+from ukpostcodeparser import parse_uk_postcode, parse_uk_postcodes
+from ukpostcodeparser import grammar
+from ukpostcodeparser.grammar import (
+    intern_postcode, iter_incodes, iter_outcodes, iter_postcodes, sample_postcodes,
+    shard_areas
+)
+from ukpostcodeparser.parser import POSTCODE_REGEX, STANDALONE_OUTCODE_REGEX
+
+
+class EnumerationTestCase(unittest.TestCase):
+
+    def test_outcodes_are_accepted_and_unique(self):
+        outcodes = list(iter_outcodes())
+        self.assertEqual(len(outcodes), len(set(outcodes)))
+        for outcode in outcodes:
+            self.assertEqual(parse_uk_postcode(outcode, True, False), (outcode, ''))
+
+    def test_outcode_order(self):
+        outcodes = list(iter_outcodes())
+        for earlier, later in [('SW1', 'SW1A'), ('SW1A', 'SW01'), ('SW9', 'SW10'),
+                               ('BB99', 'BF1'), ('BF1', 'BH0'), ('G99', 'GIR'), ('GIR', 'GL0')]:
+            self.assertLess(outcodes.index(earlier), outcodes.index(later))
+
+    def test_outcodes_cover_regex(self):
+        outcodes = set(iter_outcodes())
+        for outcode in ['W1', 'W1M', 'W12', 'W01', 'EC1A', 'EC12', 'BF1', 'B1X']:
+            self.assertTrue(STANDALONE_OUTCODE_REGEX.match(outcode))
+            self.assertIn(outcode, outcodes)
+
+    def test_incodes(self):
+        incodes = list(iter_incodes())
+        self.assertEqual(len(incodes), 4000)
+        self.assertEqual(incodes, sorted(incodes))
+        for incode in incodes:
+            self.assertTrue(POSTCODE_REGEX.match('CR0' + incode))
+
+
+
+class PostcodeGenerationTestCase(unittest.TestCase):
+
+    def test_iter_postcodes(self):
+        self.assertEqual(list(islice(iter_postcodes(), 2)), [('AB0', '0AA'), ('AB0', '0AB')])
+        postcodes = list(iter_postcodes(['BF', 'XX']))
+        self.assertEqual(len(postcodes), 4000)
+        self.assertEqual(postcodes, sorted(postcodes))
+        self.assertEqual(postcodes[-1], ('BF1', '9ZZ'))
+
+    def test_areas_in_order(self):
+        outcodes = [postcode.outcode for postcode in iter_postcodes(['W', 'CR'])]
+        self.assertEqual(outcodes[0], 'CR0')
+        self.assertEqual(outcodes[-1], 'W99')
+        self.assertNotIn('GIR', [postcode.outcode for postcode in iter_postcodes(['GIR'])])
+
+    def test_samples_match_regex(self):
+        for postcode in sample_postcodes(2000, seed=18):
+            self.assertTrue(POSTCODE_REGEX.match(''.join(postcode)), postcode)
+            self.assertEqual(parse_uk_postcode(str(postcode)), postcode)
+
+    def test_sampling_is_seeded(self):
+        self.assertEqual(list(sample_postcodes(50, seed=3)), list(sample_postcodes(50, seed=3)))
+        self.assertNotEqual(list(sample_postcodes(50, seed=3)), list(sample_postcodes(50, seed=4)))
+        self.assertEqual(list(sample_postcodes(5, areas=['ZZ'])), [])
+        self.assertEqual(len(list(islice(sample_postcodes(), 10))), 10)
+
+    def test_sampling_areas(self):
+        areas = set(postcode.area for postcode in sample_postcodes(500, seed=5, areas=['N', 'NW']))
+        self.assertEqual(areas, {'N', 'NW'})
+
+    def test_shards_partition_areas(self):
+        shards = [shard_areas(shard, 4) for shard in range(4)]
+        areas = [area for shard in shards for area in shard]
+        self.assertEqual(len(areas), len(set(areas)))
+        self.assertEqual(set(areas), set(postcode.area for postcode in
+                                          (parse_uk_postcode(outcode + ' 1AA')
+                                           for outcode in iter_outcodes() if outcode != 'GIR')))
+        self.assertEqual(shard_areas(1, 4), shards[1])
+        with self.assertRaises(ValueError):
+            shard_areas(4, 4)
+
+
+class TablesFileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def first_use(self, tables_path, enumerate):
+        script = ('import ukpostcodeparser\n'
+                  'from ukpostcodeparser import codec, grammar\n'
+                  'print(ukpostcodeparser.parse_uk_postcode("sw1a 1aa"), bool(grammar._TABLES))\n'
+                  'if not {}:\n'
+                  '    grammar._iter_areas = None\n'
+                  'print(codec.decode_postcode(codec.encode_postcode("cr0 2yr")),'
+                  ' len(grammar._tables()["outcodes"]))\n').format(enumerate)
+        env = dict(os.environ, **{grammar.TABLES_ENVIRONMENT_VARIABLE: tables_path})
+        return subprocess.check_output([sys.executable, '-c', script], env=env).splitlines()
+
+    def test_round_trip(self):
+        grammar.dump_tables(self.path)
+        areas = grammar._read_tables(self.path)
+        self.assertEqual(areas, list(grammar._iter_areas()))
+        grammar.load_tables(self.path)
+
+    def test_environment_variable(self):
+        grammar.dump_tables(self.path)
+        # The parser needs no tables, and the rest load them from the file
+        expected = [b'SW1A 1AA False', b'CR0 2YR 29241']
+        self.assertEqual(self.first_use(self.path, False), expected)
+        # Anything unusable is ignored, and the outcodes enumerated as usual
+        self.assertEqual(self.first_use(self.path + '.missing', True), expected)
+
+    def test_bad_files(self):
+        with open(self.path, 'wb') as stream:
+            stream.write(b'not tables')
+        with self.assertRaises(ValueError):
+            grammar.load_tables(self.path)
+        with open(self.path, 'wb') as stream:
+            stream.write(grammar.marshal.dumps((grammar._TABLES_FORMAT, 'old grammar', ())))
+        with self.assertRaises(ValueError):
+            grammar.load_tables(self.path)
+
+
+class InternTestCase(unittest.TestCase):
+
+    def test_intern_postcode(self):
+        first = intern_postcode(''.join(['C', 'R0']), ''.join(['2', 'YR']))
+        second = intern_postcode(''.join(['CR', '0']), ''.join(['2Y', 'R']))
+        self.assertEqual(first, ('CR0', '2YR'))
+        self.assertIs(first.outcode, second.outcode)
+        self.assertIs(first.incode, second.incode)
+
+    def test_unknown_strings_are_kept(self):
+        self.assertEqual(intern_postcode('XX0', '2YR'), ('XX0', '2YR'))
+
+    def test_batch_parsing_interns(self):
+        first, second = parse_uk_postcodes(['cr0 2yr', 'CR02YR'], intern=True)
+        self.assertIs(first[0], second[0])
+        self.assertIs(first[1], second[1])
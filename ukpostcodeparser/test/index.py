@@ -0,0 +1,116 @@
+import unittest
+import os
+import random
+import tempfile
+
+from ukpostcodeparser import codec, index
+from ukpostcodeparser.exceptions import InvalidPostcodeError
+from ukpostcodeparser.grammar import sample_postcodes
+from ukpostcodeparser.index import MappedPostcodeIndex, PostcodeIndex
+
+
+class PostcodeIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.postcodes = list(sample_postcodes(5000, seed=24, areas=['SW', 'S', 'CR', 'GU']))
+        self.index = PostcodeIndex(self.postcodes)
+        # In the order of their integers - area, district number, then incode
+        self.ordered = sorted(set(self.postcodes), key=codec.encode_postcode)
+
+    def test_membership(self):
+        self.assertEqual(len(self.index), len(set(self.postcodes)))
+        for postcode in self.postcodes[:500]:
+            self.assertIn(postcode, self.index)
+            self.assertIn(str(postcode).lower(), self.index)
+        for postcode in ['N16 8QS', 'xx0 2yr', 'cr0', '', 'GIR 0AA']:
+            self.assertNotIn(postcode, self.index)
+        # As for a set, anything that is not a postcode is simply not in it
+        for postcode in [None, 5, ('CR0',), ([], '1AA')]:
+            self.assertNotIn(postcode, self.index)
+
+    def test_order_and_duplicates(self):
+        self.assertEqual(list(self.index), self.ordered)
+        self.assertEqual(len(PostcodeIndex(['cr0 2yr', 'CR02YR', ('CR0', '2YR')])), 1)
+
+    def test_prefixes(self):
+        for prefix in ['SW', 'S', 'SW1A', 'SW1', 'S1', 'CR0 2', 'GU10 4', 'N', 'XX', 'SW1A 1']:
+            expected = [postcode for postcode in self.ordered
+                        if postcode.area == prefix or postcode.district == prefix or
+                        postcode.sector == prefix]
+            found = self.index.iter_prefix(prefix.lower())
+            self.assertFalse(isinstance(found, list))
+            self.assertEqual(list(found), expected, prefix)
+            self.assertEqual(self.index.count_prefix(prefix), len(expected), prefix)
+
+    def test_invalid_postcodes(self):
+        with self.assertRaises(InvalidPostcodeError):
+            PostcodeIndex(['cr0 2yr', 'xx0 2yr'])
+
+    def test_from_codes(self):
+        codes = [codec.encode_postcode(postcode) for postcode in self.postcodes]
+        random.Random(1).shuffle(codes)
+        self.assertEqual(list(PostcodeIndex.from_codes(codes)), list(self.index))
+        self.assertEqual(list(self.index.codes()), sorted(set(codes)))
+
+    def test_save_and_load(self):
+        path = self._temporary_path()
+        self.index.save(path)
+        loaded = PostcodeIndex.load(path)
+        self.assertEqual(list(loaded), list(self.index))
+        self.assertEqual(loaded.count_prefix('SW'), self.index.count_prefix('SW'))
+        self.assertIn('CR0 2YR', PostcodeIndex(['cr0 2yr']))
+
+        PostcodeIndex().save(path)
+        self.assertEqual(len(PostcodeIndex.load(path)), 0)
+        self._assert_bad_files_rejected(path, PostcodeIndex.load)
+
+    def test_mapped(self):
+        path = self._temporary_path()
+        self.index.save(path)
+        with MappedPostcodeIndex(path) as mapped:
+            self.assertEqual(len(mapped), len(self.index))
+            self.assertEqual(list(mapped), list(self.index))
+            self.assertEqual(list(mapped.codes()), list(self.index.codes()))
+            for postcode in self.postcodes[:500] + ['N16 8QS', 'xx0 2yr', 'cr0', None, 5]:
+                self.assertEqual(postcode in mapped, postcode in self.index)
+            for prefix in ['SW', 'S', 'SW1A', 'S1', 'CR0 2', 'GU10 4', 'N', 'XX']:
+                self.assertEqual(list(mapped.iter_prefix(prefix)),
+                                 list(self.index.iter_prefix(prefix)), prefix)
+            # Saved again from the mapping, the file is unchanged
+            copy = self._temporary_path()
+            mapped.save(copy)
+            with open(path, 'rb') as original, open(copy, 'rb') as saved:
+                self.assertEqual(original.read(), saved.read())
+        mapped.close()
+
+        PostcodeIndex().save(path)
+        with MappedPostcodeIndex(path) as mapped:
+            self.assertEqual(len(mapped), 0)
+            self.assertNotIn('CR0 2YR', mapped)
+            self.assertEqual(mapped.count_prefix('CR'), 0)
+        self._assert_bad_files_rejected(path, MappedPostcodeIndex)
+
+    def test_outcode_count(self):
+        # Counted from the grammar, so opening a file needs no codec tables
+        self.assertEqual(index._outcode_count(), len(codec._tables()['outcodes']))
+
+    def _assert_bad_files_rejected(self, path, open_index):
+        with open(path, 'wb') as stream:
+            stream.write(b'not an index')
+        self.assertRaises(ValueError, open_index, path)
+
+        self.index.save(path)
+        with open(path, 'r+b') as stream:
+            stream.truncate(os.path.getsize(path) - 4)
+        self.assertRaises(ValueError, open_index, path)
+
+        # Written for another grammar
+        with open(path, 'wb') as stream:
+            stream.write(index._HEADER.pack(index.MAGIC, 0, 10, 0) + b'\0' * 44)
+        self.assertRaises(ValueError, open_index, path)
+
+    def _temporary_path(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        return path
@@ -0,0 +1,94 @@
+import unittest
+
+try:
+    import prometheus_client.core
+except ImportError:
+    prometheus_client = None
+
+from ukpostcodeparser import (metrics, parse_uk_postcode, parse_uk_postcodes, parser,
+                              vectorized)
+from ukpostcodeparser.cache import CachedPostcodeParser
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        metrics.disable()
+
+    def parse_all(self, postcodes, strict=True, incode_mandatory=True):
+        return list(parse_uk_postcodes(postcodes, strict, incode_mandatory))
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(metrics.enabled())
+        self.assertIs(parser._parse, metrics._PARSE)
+
+    def test_strict_outcomes_and_paths(self):
+        counts = metrics.enable()
+        self.assertIs(metrics.enabled(), counts)
+        self.parse_all(['cr0 2yr', 'gir 0aa', 'bf1 1aa', 'cr0', 'gir', 'xx0 2yr',
+                        'x' * 20])
+        self.assertEqual(counts.as_dict(), {
+            'outcomes': {'full': 1, 'girobank': 1, 'british_forces': 1,
+                         'incode_missing': 2, 'invalid': 1, 'max_length': 1},
+            'paths': {'full_match': 2, 'girobank': 2, 'outcode_fallback': 1,
+                      'no_match': 1, 'too_long': 1},
+        })
+
+    def test_optional_incode_and_non_strict(self):
+        counts = metrics.enable()
+        self.parse_all(['cr0', 'gir'], incode_mandatory=False)
+        self.parse_all(['xx0 2yr', 'xx0'], strict=False, incode_mandatory=False)
+        self.assertEqual(counts.as_dict(), {
+            'outcomes': {'outcode_only': 2, 'girobank': 1, 'full': 1},
+            'paths': {'outcode_fallback': 1, 'girobank': 1, 'chop': 2},
+        })
+
+    def test_every_entry_point(self):
+        counts = metrics.enable()
+        parse_uk_postcode('cr0 2yr')
+        with self.assertRaises(ValueError):
+            parse_uk_postcode('xx0 2yr')
+        CachedPostcodeParser()('cr0 2yr')
+        self.assertEqual(counts.as_dict()['outcomes'], {'full': 2, 'invalid': 1})
+
+    def test_disable_and_reset(self):
+        counts = metrics.enable()
+        parse_uk_postcode('cr0 2yr')
+        metrics.disable()
+        parse_uk_postcode('cr0 2yr')
+        self.assertEqual(counts.as_dict()['paths'], {'full_match': 1})
+        counts.reset()
+        self.assertEqual(counts.as_dict(), {'outcomes': {}, 'paths': {}})
+
+    def test_timings(self):
+        counts = metrics.enable(metrics.ParserMetrics(timings=True))
+        self.parse_all(['cr0 2yr', 'sw1a 1aa', 'xx0 2yr'])
+        timings = counts.as_dict()['timings']
+        self.assertEqual(sorted(timings), ['full_match', 'no_match'])
+        self.assertEqual(sum(timings['full_match']['buckets']), 2)
+        self.assertEqual(len(timings['no_match']['buckets']), len(metrics.TIMING_BUCKETS))
+        self.assertGreater(timings['full_match']['seconds'], 0)
+
+    @unittest.skipIf(vectorized.numpy is None, 'numpy is not installed')
+    def test_vectorized_rows_parsed_one_at_a_time(self):
+        counts = metrics.enable()
+        vectorized.parse_array(['cr0 2yr', 'cr\u00e9 2yr', 'sw1a' + ' ' * 20 + '1aa'])
+        # Only the non-ASCII row and the wide row reach the parser's core
+        self.assertEqual(counts.as_dict()['outcomes'], {'full': 1, 'invalid': 1})
+
+
+@unittest.skipIf(prometheus_client is None, 'prometheus_client is not installed')
+class PrometheusTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_register(self):
+        registry = prometheus_client.core.CollectorRegistry()
+        counts = metrics.enable(metrics.ParserMetrics(timings=True))
+        metrics.register_prometheus(counts, registry)
+        parse_uk_postcode('cr0 2yr')
+        self.assertEqual(registry.get_sample_value(
+            'ukpostcodeparser_outcomes_total', {'outcome': 'full'}), 1)
+        self.assertEqual(registry.get_sample_value(
+            'ukpostcodeparser_parse_seconds_count', {'path': 'full_match'}), 1)
@@ -1,7 +1,13 @@
 import unittest
 import inspect
+import random
+import subprocess
+import sys
 
-from ukpostcodeparser import parse_uk_postcode
+from ukpostcodeparser import parse_uk_postcode, parse_uk_postcodes, parser
+from ukpostcodeparser.parser import (
+    POSTAL_ZONES, is_outcode, match_strict, normalise_postcode, _match_strict_regex
+)
 from ukpostcodeparser.exceptions import (
     InvalidPostcodeError, MaxLengthExceededError, IncodeNotFoundError
 )
@@ -41,6 +47,106 @@ class BackwardsCompatibilityTestCase(unittest.TestCase):
         self.assertEquals(cm.exception.__class__, InvalidPostcodeError)
 
 
+class BatchParseTestCase(unittest.TestCase):
+
+    def test_results_in_input_order(self):
+        results = list(parse_uk_postcodes(['cr0 2yr', 'n16', 'xx0 2yr', 'N16 8QSSS']))
+        self.assertEqual(results, [
+            ('CR0', '2YR', None),
+            ('', '', IncodeNotFoundError),
+            ('', '', InvalidPostcodeError),
+            ('', '', MaxLengthExceededError),
+        ])
+
+    def test_flags_are_honoured(self):
+        results = list(parse_uk_postcodes(['n16', 'xx0 2yr'], False, False))
+        self.assertEqual(results, [('N16', '', None), ('XX0', '2YR', None)])
+
+    def test_workers_keep_input_order(self):
+        postcodes = ['cr0 2yr', 'n16', 'xx0 2yr', 'sw1a 1aa', 'N16 8QSSS'] * 20
+        results = parse_uk_postcodes(iter(postcodes), workers=2, chunksize=3)
+        self.assertEqual(list(results), list(parse_uk_postcodes(postcodes)))
+
+    def test_accepts_any_iterable(self):
+        results = parse_uk_postcodes(postcode for postcode in ['GIR 0AA'])
+        self.assertEqual(next(results), ('GIR', '0AA', None))
+
+
+class IsOutcodeTestCase(unittest.TestCase):
+
+    def test_valid_outcodes(self):
+        for outcode in ['W1', 'W1M', 'SW1A', 'EC12', 'BF1', 'GIR', 'N\u0663']:
+            self.assertTrue(is_outcode(outcode), outcode)
+
+    def test_invalid_outcodes(self):
+        for outcode in ['', 'W', 'XX0', 'SW1AA', 'GIR0', 'BF2', 'sw1a', 'SW1A1AA']:
+            self.assertFalse(is_outcode(outcode), outcode)
+
+
+class LazyCompilationTestCase(unittest.TestCase):
+
+    def test_regexs_not_compiled_by_strict_ascii_parsing(self):
+        # In a fresh process, as other tests compile them
+        script = ('import ukpostcodeparser\n'
+                  'ukpostcodeparser.parse_uk_postcode("cr0 2yr")\n'
+                  'print(ukpostcodeparser.parser._REGEXS == ())\n')
+        output = subprocess.check_output([sys.executable, '-c', script])
+        self.assertEqual(output.strip(), b'True')
+
+    def test_lazy_attributes(self):
+        self.assertEqual(parser.POSTCODE_REGEX.pattern, parser.POSTCODE_PATTERN)
+        self.assertEqual(parser.STANDALONE_OUTCODE_REGEX.pattern,
+                         parser.OUTCODE_PATTERN + r'\s*$')
+        self.assertTrue(parser.INCODE_PATTERN)
+        with self.assertRaises(AttributeError):
+            parser.NO_SUCH_REGEX
+
+
+class NormaliseTestCase(unittest.TestCase):
+
+    def test_strips_all_whitespace(self):
+        self.assertEqual(normalise_postcode(' cr0\t2yr\u00a0\n'), 'CR02YR')
+
+    def test_rejects_long_input(self):
+        self.assertIsNone(normalise_postcode('sw1a 1aax'))
+        self.assertIsNone(normalise_postcode('x' * 10240))
+
+    def test_long_input_of_mostly_whitespace_is_accepted(self):
+        self.assertEqual(normalise_postcode('\t' * 100 + 'cr0 2yr'), 'CR02YR')
+
+    def test_unicode_whitespace_is_ignored_when_parsing(self):
+        self.assertEqual(parse_uk_postcode('CR0\u00a02YR'), ('CR0', '2YR'))
+        self.assertEqual(parse_uk_postcode('CR0\t2YR', False), ('CR0', '2YR'))
+
+    def test_batch_parsing_accepts_other_normalisers(self):
+        results = parse_uk_postcodes(['cr0-2yr'], normalise=lambda p: p.replace('-', '').upper())
+        self.assertEqual(list(results), [('CR0', '2YR', None)])
+
+
+class StrictEngineTestCase(unittest.TestCase):
+
+    def assert_same_as_regex(self, postcode):
+        self.assertEqual(
+            match_strict(postcode),
+            _match_strict_regex(postcode),
+            'State machine disagrees with regexs for postcode={!r}'.format(postcode)
+        )
+
+    def test_agrees_with_regex_on_random_input(self):
+        rng = random.Random(42)
+        alphabet = 'ABEFGIMNRSWXYZ0123456789\t'
+        for _ in range(20000):
+            postcode = rng.choice(POSTAL_ZONES + ['BF', 'GIR', ''])
+            while len(postcode) < rng.randint(0, 7):
+                postcode += rng.choice(alphabet)
+            self.assert_same_as_regex(postcode)
+
+    def test_agrees_with_regex_on_edge_cases(self):
+        for postcode in ['', 'W', 'W1', 'W1M', 'W1M4ZZ', 'W12AB', 'W12ABX', 'SW1A1AA',
+                         'BF1', 'BF11AA', 'BF1A1AA', 'CR0\t', 'CR0\t2YR', 'GIR0AA']:
+            self.assert_same_as_regex(postcode)
+
+
 class PostcodeTestCase(unittest.TestCase):
 
     def run_parser(self, postcode, strict, incode_mandatory, expected):
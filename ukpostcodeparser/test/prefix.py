@@ -0,0 +1,83 @@
+import unittest
+import random
+
+from ukpostcodeparser import prefix
+from ukpostcodeparser.grammar import iter_outcodes
+from ukpostcodeparser.parser import POSTAL_ZONES, parse_uk_postcodes
+from ukpostcodeparser.prefix import PrefixValidator
+
+
+class PrefixValidatorTestCase(unittest.TestCase):
+
+    def test_every_prefix_of_a_postcode_is_viable(self):
+        validator = PrefixValidator()
+        for char in 'ec1a 1bb':
+            self.assertTrue(validator.push(char))
+        self.assertTrue(validator.is_complete)
+        self.assertEqual(validator.postcode, ('EC1A', '1BB'))
+        self.assertEqual(validator.prefix, 'EC1A1BB')
+
+    def test_outcodes(self):
+        for outcode in ['W1', 'W1M', 'SW1A', 'BF1', 'GIR']:
+            validator = PrefixValidator(outcode)
+            self.assertTrue(validator.is_outcode, outcode)
+            self.assertFalse(validator.is_complete, outcode)
+        self.assertFalse(PrefixValidator('SW').is_outcode)
+
+    def test_dead_ends(self):
+        for prefix in ['Q', 'XX', 'SW1A1C', 'GIR1', 'CR02YRX']:
+            self.assertFalse(PrefixValidator(prefix).viable, prefix)
+
+    def test_ambiguous_outcode(self):
+        # Either the outcode W12, or W1 followed by the start of an incode
+        validator = PrefixValidator('W12')
+        self.assertTrue(validator.is_outcode)
+        self.assertTrue({'0', 'A'} <= validator.allowed_next())
+        validator.feed('AB')
+        self.assertEqual(validator.postcode, ('W1', '2AB'))
+        validator.reset()
+        validator.feed('W122AB')
+        self.assertEqual(validator.postcode, ('W12', '2AB'))
+
+    def test_pop_and_reset(self):
+        validator = PrefixValidator('SW1X')
+        self.assertFalse(validator.push('Q'))
+        validator.pop()
+        self.assertTrue(validator.viable)
+        self.assertEqual(validator.prefix, 'SW1X')
+        validator.reset()
+        self.assertEqual(validator.prefix, '')
+        validator.pop()
+        self.assertTrue(validator.viable)
+
+    def test_allowed_next(self):
+        self.assertEqual(PrefixValidator('GIR 0').allowed_next(), set('A'))
+        self.assertEqual(PrefixValidator('CR0 2Y').allowed_next(), set('ABDEFGHJLNPQRSTUWXYZ'))
+        self.assertEqual(PrefixValidator('CR0 2YR').allowed_next(), set())
+        self.assertIn('W', PrefixValidator('S').allowed_next())
+
+    def test_agrees_with_parser(self):
+        rng = random.Random(13)
+        postcodes = []
+        for _ in range(3000):
+            postcode = rng.choice(POSTAL_ZONES + ['BF', 'GI'])
+            while len(postcode) < rng.randint(2, 7):
+                postcode += rng.choice('ABDEFGHIMRSWZ0123456789')
+            postcodes.append(postcode)
+
+        results = parse_uk_postcodes(postcodes)
+        for postcode, (outcode, incode, error) in zip(postcodes, results):
+            exact = error is None and outcode + incode == postcode
+            self.assertEqual(PrefixValidator(postcode).is_complete, exact, postcode)
+
+        results = parse_uk_postcodes(postcodes, True, False)
+        for postcode, (outcode, incode, error) in zip(postcodes, results):
+            exact = error is None and not incode and outcode == postcode
+            self.assertEqual(PrefixValidator(postcode).is_outcode, exact, postcode)
+
+    def test_tables_match_the_grammar(self):
+        outcodes = list(iter_outcodes())
+        tables = prefix._tables()
+        self.assertEqual(tables['outcode_prefixes'], frozenset(
+            outcode[:end] for outcode in outcodes for end in range(len(outcode) + 1)
+        ))
@@ -0,0 +1,57 @@
+import unittest
+import pickle
+
+from ukpostcodeparser import parse_uk_postcode, Postcode, ResultCode
+from ukpostcodeparser.exceptions import InvalidPostcodeError, IncodeNotFoundError
+
+
+class PostcodeTestCase(unittest.TestCase):
+
+    def test_behaves_as_tuple(self):
+        postcode = parse_uk_postcode('sw1a 1aa')
+        self.assertIsInstance(postcode, Postcode)
+        self.assertEqual(postcode, ('SW1A', '1AA'))
+        outcode, incode = postcode
+        self.assertEqual((outcode, incode), ('SW1A', '1AA'))
+        self.assertEqual(repr(postcode), "('SW1A', '1AA')")
+
+    def test_has_no_instance_dictionary(self):
+        self.assertFalse(hasattr(Postcode('CR0', '2YR'), '__dict__'))
+
+    def test_parts(self):
+        postcode = Postcode('SW1A', '1AA')
+        self.assertEqual(postcode.outcode, 'SW1A')
+        self.assertEqual(postcode.incode, '1AA')
+        self.assertEqual(postcode.area, 'SW')
+        self.assertEqual(postcode.district, 'SW1A')
+        self.assertEqual(postcode.sector, 'SW1A 1')
+        self.assertEqual(postcode.unit, 'SW1A 1AA')
+        self.assertEqual(str(postcode), 'SW1A 1AA')
+
+    def test_parts_of_outcode_only(self):
+        postcode = parse_uk_postcode('n16', True, False)
+        self.assertEqual(postcode.area, 'N')
+        self.assertEqual(postcode.sector, '')
+        self.assertEqual(str(postcode), 'N16')
+
+    def test_girobank(self):
+        self.assertEqual(parse_uk_postcode('GIR 0AA').area, 'GIR')
+
+    def test_pickles(self):
+        postcode = Postcode('CR0', '2YR')
+        copy = pickle.loads(pickle.dumps(postcode))
+        self.assertEqual(copy, postcode)
+        self.assertIsInstance(copy, Postcode)
+
+
+class ResultCodeTestCase(unittest.TestCase):
+
+    def test_valid_is_false(self):
+        self.assertFalse(ResultCode.VALID)
+        self.assertTrue(ResultCode.INVALID)
+
+    def test_round_trips_exceptions(self):
+        for code in ResultCode:
+            self.assertIs(ResultCode.for_error(code.exception), code)
+        self.assertIs(ResultCode.INVALID.exception, InvalidPostcodeError)
+        self.assertIs(ResultCode.for_error(IncodeNotFoundError), ResultCode.INCODE_NOT_FOUND)
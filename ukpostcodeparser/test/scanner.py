@@ -0,0 +1,104 @@
+import unittest
+import os
+import random
+import tempfile
+
+from ukpostcodeparser import parse_uk_postcode
+from ukpostcodeparser.parser import POSTAL_ZONES
+from ukpostcodeparser.scanner import (
+    find_uk_postcodes, find_uk_postcodes_in_bytes, scan_file
+)
+
+
+class FindPostcodesTestCase(unittest.TestCase):
+
+    def find(self, text):
+        return [(text[start:end], outcode, incode)
+                for start, end, outcode, incode in find_uk_postcodes(text)]
+
+    def test_finds_postcodes_in_text(self):
+        text = 'Write to SW1A 2AA, or to cr0 2yr (not XX0 2YR) by 1st May.'
+        self.assertEqual(self.find(text), [
+            ('SW1A 2AA', 'SW1A', '2AA'),
+            ('cr0 2yr', 'CR0', '2YR'),
+        ])
+
+    def test_whitespace_between_outcode_and_incode(self):
+        self.assertEqual(self.find('N168QS, N16\t8QS, N16   8QS'), [
+            ('N168QS', 'N16', '8QS'),
+            ('N16\t8QS', 'N16', '8QS'),
+            ('N16   8QS', 'N16', '8QS'),
+        ])
+        self.assertEqual(self.find('N16\n8QS N16    8QS'), [])
+        self.assertEqual(self.find('N16\u00a08QS'), [('N16\u00a08QS', 'N16', '8QS')])
+
+    def test_ascii_letters_only(self):
+        # The Kelvin sign matches K when ignoring case in Unicode, but
+        # parse_uk_postcode rejects it
+        self.assertEqual(self.find('\u212aA1 1AA'), [])
+        with self.assertRaises(ValueError):
+            parse_uk_postcode('\u212aA1 1AA')
+
+    def test_word_boundaries(self):
+        self.assertEqual(self.find('XSW1A 2AA SW1A 2AAX 2SW1A 2AA'), [])
+        self.assertEqual(self.find('(SW1A 2AA)'), [('SW1A 2AA', 'SW1A', '2AA')])
+
+    def test_special_cases(self):
+        self.assertEqual(self.find('GIR 0AA GIR 1AB BF1 3AA'), [
+            ('GIR 0AA', 'GIR', '0AA'),
+            ('BF1 3AA', 'BF1', '3AA'),
+        ])
+
+    def test_positions(self):
+        text = 'a SW1A 2AA b'
+        self.assertEqual(list(find_uk_postcodes(text)), [(2, 10, 'SW1A', '2AA')])
+        self.assertEqual(list(find_uk_postcodes(text, 3)), [])
+        self.assertEqual(list(find_uk_postcodes(text, 0, 9)), [])
+
+    def test_matches_agree_with_parser(self):
+        rng = random.Random(17)
+        words = []
+        for _ in range(5000):
+            word = rng.choice(POSTAL_ZONES + ['BF', 'GIR'])
+            while len(word) < rng.randint(2, 8):
+                word += rng.choice('ABDEFGHMNRSTWZ0123456789 ')
+            words.append(word)
+        for _, _, outcode, incode in find_uk_postcodes(', '.join(words)):
+            self.assertEqual(parse_uk_postcode(outcode + incode), (outcode, incode))
+
+
+class ScanFileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, content):
+        with open(self.path, 'wb') as stream:
+            stream.write(content)
+
+    def test_bytes(self):
+        self.assertEqual(list(find_uk_postcodes_in_bytes(bytearray(b'to cr0 2yr.'))),
+                         [(3, 10, 'CR0', '2YR')])
+
+    def test_scan_file_matches_text_scan(self):
+        rng = random.Random(19)
+        words = ['road', 'flat 2b', 'SW1A 1AA', 'cr0\t2yr', 'GIR 0AA', 'caf\u00e9', 'N16 8QS']
+        text = ' '.join(rng.choice(words) for _ in range(5000))
+        self.write(text.encode('utf-8'))
+        expected = [(outcode, incode) for _, _, outcode, incode in find_uk_postcodes(text)]
+
+        for workers, region_size in [(None, 1024), (2, 1000), (3, 7)]:
+            results = list(scan_file(self.path, workers, region_size))
+            self.assertEqual([result[2:] for result in results], expected)
+
+        data = text.encode('utf-8')
+        for start, end, outcode, incode in scan_file(self.path):
+            self.assertEqual(data[start:end].split()[0].decode('ascii').upper(), outcode)
+
+    def test_empty_file(self):
+        self.write(b'')
+        self.assertEqual(list(scan_file(self.path)), [])
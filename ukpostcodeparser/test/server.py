@@ -0,0 +1,104 @@
+import unittest
+import http.client
+import json
+import subprocess
+import sys
+import threading
+
+from ukpostcodeparser.server import make_server
+
+
+class ServerTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = make_server(port=0)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def setUp(self):
+        self.connection = http.client.HTTPConnection(*self.server.server_address[:2])
+
+    def tearDown(self):
+        self.connection.close()
+
+    def request(self, method, path, body=None, headers={}):
+        self.connection.request(method, path, body, headers)
+        response = self.connection.getresponse()
+        return response.status, response.getheader('Content-Type'), response.read()
+
+    def test_parse(self):
+        status, _, body = self.request('GET', '/parse?postcode=cr0+2yr')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {
+            'postcode': 'cr0 2yr', 'outcode': 'CR0', 'incode': '2YR', 'reason': 'valid'
+        })
+        status, _, body = self.request('POST', '/parse?incode_mandatory=false',
+                                       json.dumps({'postcode': 'cr0'}))
+        self.assertEqual(json.loads(body)['outcode'], 'CR0')
+        _, _, body = self.request('GET', '/parse?postcode=cr0')
+        self.assertEqual(json.loads(body)['reason'], 'incode_not_found')
+
+    def test_connection_kept_alive(self):
+        for _ in range(3):
+            self.request('GET', '/parse?postcode=n16+8qs')
+        socket = self.connection.sock
+        self.request('POST', '/parse/bulk', '["n16 8qs"]')
+        self.assertIs(self.connection.sock, socket)
+
+    def test_bulk_json(self):
+        postcodes = ['cr0 2yr', 'xx0 2yr', 'n16'] * 1000
+        status, content_type, body = self.request('POST', '/parse/bulk?strict=false',
+                                                  json.dumps(postcodes))
+        self.assertEqual((status, content_type), (200, 'application/json'))
+        results = json.loads(body)
+        self.assertEqual(len(results), 3000)
+        self.assertEqual([result['reason'] for result in results[:3]],
+                         ['valid', 'valid', 'incode_not_found'])
+        self.assertEqual(json.loads(self.request('POST', '/parse/bulk', '[]')[2]), [])
+
+    def test_bulk_ndjson(self):
+        body = '"cr0 2yr"\n\n"xx0 2yr"\nsw1a 1aa\n5\n'
+        status, content_type, body = self.request(
+            'POST', '/parse/bulk', body, {'Content-Type': 'application/x-ndjson'}
+        )
+        self.assertEqual((status, content_type), (200, 'application/x-ndjson'))
+        results = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([result['reason'] for result in results],
+                         ['valid', 'invalid', 'valid', 'invalid'])
+        self.assertEqual(results[2]['outcode'], 'SW1A')
+
+    def test_errors(self):
+        self.assertEqual(self.request('GET', '/nowhere')[0], 404)
+        self.assertEqual(self.request('GET', '/parse')[0], 400)
+        self.assertEqual(self.request('GET', '/parse?postcode=cr0&strict=maybe')[0], 400)
+        self.assertEqual(self.request('POST', '/parse/bulk', '{"not": "a list"}')[0], 400)
+        self.assertEqual(self.request('POST', '/parse/bulk', '[1]')[0], 400)
+        self.assertEqual(self.request('POST', '/parse/bulk', 'nonsense')[0], 400)
+
+
+class PreforkTestCase(unittest.TestCase):
+
+    def test_serve_with_workers(self):
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'ukpostcodeparser', 'serve', '--port', '0', '--workers', '2'],
+            stdout=subprocess.PIPE
+        )
+        try:
+            address = process.stdout.readline().split()[2].decode()
+            host, port = address[len('http://'):].rstrip('/').split(':')
+            for _ in range(4):
+                connection = http.client.HTTPConnection(host, int(port), timeout=10)
+                connection.request('GET', '/parse?postcode=sw1a1aa')
+                self.assertEqual(json.loads(connection.getresponse().read())['incode'], '1AA')
+                connection.close()
+        finally:
+            process.terminate()
+            self.assertEqual(process.wait(timeout=10), 0)
+            process.stdout.close()
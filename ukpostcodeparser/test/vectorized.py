@@ -0,0 +1,74 @@
+import unittest
+import random
+
+from ukpostcodeparser.parser import POSTAL_ZONES, parse_uk_postcodes
+from ukpostcodeparser.result import ResultCode
+from ukpostcodeparser.vectorized import numpy, parse_array, parse_codes, split_array
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class ParseArrayTestCase(unittest.TestCase):
+
+    def assert_same_as_parser(self, postcodes, strict, incode_mandatory):
+        result = parse_array(postcodes, strict, incode_mandatory)
+        outcodes, incodes = split_array(result)
+        expected = parse_uk_postcodes(postcodes, strict, incode_mandatory)
+        for index, (outcode, incode, error) in enumerate(expected):
+            m = 'Mismatch for postcode={!r}, strict={!r} and incode_mandatory={!r}'
+            self.assertEqual(
+                (outcode, incode, error is None, ResultCode.for_error(error)),
+                (outcodes[index], incodes[index], result.valid[index], result.status[index]),
+                m.format(postcodes[index], strict, incode_mandatory)
+            )
+
+    def test_agrees_with_parser(self):
+        rng = random.Random(7)
+        alphabet = 'abefgimnrswxyzABEFGIMNRSWXYZ0123456789 \t\u00a0'
+        postcodes = ['GIR 0AA', 'gir', '', ' ', 'x' * 20, 'CR0 2YR', 'W12ABX']
+        for _ in range(5000):
+            postcode = rng.choice(POSTAL_ZONES + ['BF', 'GIR', ''])
+            while len(postcode) < rng.randint(0, 10):
+                postcode += rng.choice(alphabet)
+            postcodes.append(postcode)
+
+        for strict in (True, False):
+            for incode_mandatory in (True, False):
+                self.assert_same_as_parser(postcodes, strict, incode_mandatory)
+
+    def test_split_indices(self):
+        result = parse_array(['cr0 2yr', 'sw1a', 'xx0 2yr'], incode_mandatory=False)
+        self.assertEqual(result.postcodes.tolist(), ['CR02YR', 'SW1A', 'XX02YR'])
+        self.assertEqual(result.valid.tolist(), [True, True, False])
+        self.assertEqual(result.outcode_end.tolist(), [3, 4, 0])
+        self.assertEqual(result.incode_end.tolist(), [6, 4, 0])
+
+    def test_byte_strings(self):
+        result = parse_array(numpy.array([b'cr0 2yr', b'n16 8qs'], dtype='S8'))
+        outcodes, incodes = split_array(result)
+        self.assertEqual(outcodes.tolist(), [b'CR0', b'N16'])
+        self.assertEqual(incodes.tolist(), [b'2YR', b'8QS'])
+
+    def test_object_arrays(self):
+        postcodes = numpy.array(['cr0 2yr', None, float('nan'), b'n16 8qs'], dtype=object)
+        result = parse_array(postcodes)
+        self.assertEqual(result.valid.tolist(), [True, False, False, True])
+
+    def test_non_ascii_rows_match_parser(self):
+        self.assert_same_as_parser(['CR0\u00a02YR', '\u00df', 'N\u0663 8QS'], True, True)
+
+    def test_wide_rows_match_parser(self):
+        postcodes = ['cr0 2yr', 'x' * 600, '   cr0   2yr        \t   ', 'cr0' + ' ' * 40 + '2yr',
+                     'cr0 2yr' + ' ' * 20 + 'x', 'n16 8qs ' * 3, '']
+        for strict in (True, False):
+            self.assert_same_as_parser(postcodes, strict, True)
+            self.assert_same_as_parser(numpy.array(postcodes, dtype=object), strict, True)
+        result = parse_array(numpy.array(postcodes, dtype=object))
+        self.assertEqual(result.postcodes.dtype, numpy.dtype('U7'))
+
+    def test_codes_without_decode(self):
+        codes = numpy.zeros((3, 40), dtype=numpy.uint8)
+        for row, postcode in enumerate([b'cr0 2yr', b'cr0' + b' ' * 30 + b'2yr', b'cr0 2y\xe9']):
+            codes[row, :len(postcode)] = list(postcode)
+        result = parse_codes(codes)
+        self.assertEqual(result[1].tolist(), [True, True, False])
+        self.assertEqual(result[4].tolist(), [ResultCode.VALID, ResultCode.VALID, ResultCode.INVALID])
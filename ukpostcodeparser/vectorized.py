@@ -0,0 +1,373 @@
+'''Vectorised UK postcode parsing with NumPy
+
+Provides parse_array, which validates and splits a whole array of postcodes
+using array operations instead of calling parse_uk_postcode per element.
+NumPy is optional; without it this module still imports, but parse_array
+raises ImportError.'''
+
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - depends on the environment
+    numpy = None
+
+from ukpostcodeparser import parser
+from ukpostcodeparser.result import ResultCode
+
+
+ParsedArray = namedtuple(
+    'ParsedArray', ['postcodes', 'valid', 'outcode_end', 'incode_end', 'status']
+)
+ParsedArray.__doc__ = '''Result of parse_array.
+
+postcodes           The normalised postcodes - whitespace removed, upper
+                    case - as a fixed width string array. Empty where the
+                    input was longer than seven characters.
+valid               Boolean mask, true where parse_uk_postcode would have
+                    returned rather than raised.
+outcode_end         Index into postcodes where the outcode ends and the
+                    incode starts. Zero where not valid.
+incode_end          Index into postcodes where the incode ends. Equal to
+                    outcode_end for an outcode on its own, zero where not
+                    valid.
+status              The ResultCode of each postcode, as int8.'''
+
+# ASCII characters for which str.isspace() is true
+WHITESPACE_CODES = [9, 10, 11, 12, 13, 28, 29, 30, 31, 32]
+# Characters of each row normalised as arrays. Longer rows are parsed one at
+# a time, unless already too long in their first MAX_WIDTH characters.
+MAX_WIDTH = 16
+
+
+def parse_array(postcodes, strict=True, incode_mandatory=True):
+    '''Split an array of UK postcodes into outcode and incode portions.
+
+    Arguments:
+    postcodes           A NumPy array, or anything numpy.asarray accepts, of
+                        str (U), bytes (S) or object values. Object values
+                        that are not str or bytes, such as None or NaN, are
+                        treated as invalid.
+    strict              As for parse_uk_postcode.
+    incode_mandatory    As for parse_uk_postcode.
+
+    Returns:            A ParsedArray. Byte string input gives byte string
+                        postcodes, anything else gives str postcodes.
+
+    Usage example:      >>> result = parse_array(['cr0 2yr', 'cr0', 'xx0 2yr'])
+                        >>> result.valid
+                        array([ True, False, False])
+                        >>> split_array(result)
+                        (array(['CR0', '', ''], dtype='<U4'), array(['2YR', '', ''], dtype='<U3'))
+    '''
+
+    _require_numpy()
+    array = numpy.asarray(postcodes)
+    if array.ndim != 1:
+        array = array.reshape(-1)
+    as_bytes = array.dtype.kind == 'S'
+    if array.dtype.kind == 'O':
+        array, missing, decode = _from_objects(array)
+    elif array.dtype.kind in 'SU':
+        missing, decode = None, _decoder(array)
+    else:
+        raise TypeError('Expected an array of strings, got dtype {}'.format(array.dtype))
+
+    codes = _as_codes(array)
+    result = parse_codes(codes, strict, incode_mandatory, decode)
+    normalised, valid, outcode_end, incode_end, status = result
+
+    if missing is not None:
+        valid &= ~missing
+        outcode_end[missing] = 0
+        incode_end[missing] = 0
+        status[missing] = ResultCode.INVALID
+    if as_bytes:
+        # Results outside ASCII cannot be held in a byte string array
+        unrepresentable = (normalised >= 128).any(axis=1)
+        if unrepresentable.any():
+            normalised[unrepresentable] = 0
+            valid &= ~unrepresentable
+            outcode_end[unrepresentable] = 0
+            incode_end[unrepresentable] = 0
+            status[unrepresentable] = ResultCode.INVALID
+        normalised = normalised.astype(numpy.uint8).view('S7')[:, 0]
+    else:
+        normalised = normalised.view('U7')[:, 0]
+
+    return ParsedArray(normalised, valid, outcode_end, incode_end, status)
+
+
+def split_array(parsed):
+    '''Return outcode and incode arrays from the result of parse_array.
+
+    Both are empty strings where the postcode was not valid, and the incode
+    is empty for an outcode on its own.
+    '''
+
+    _require_numpy()
+    postcodes = parsed.postcodes
+    kind = postcodes.dtype.kind
+    width = 1 if kind == 'S' else 4
+    dtype = numpy.uint8 if kind == 'S' else numpy.uint32
+    chars = postcodes.view(dtype).reshape(len(postcodes), postcodes.itemsize // width)
+    chars = numpy.pad(chars, ((0, 0), (0, 7 - chars.shape[1])))
+
+    outcode_end = parsed.outcode_end.astype(numpy.intp)
+    incode_end = parsed.incode_end.astype(numpy.intp)
+    positions = numpy.arange(4)
+    outcodes = numpy.where(positions < outcode_end[:, None], chars[:, :4], 0)
+
+    positions = numpy.arange(3)
+    indices = numpy.minimum(outcode_end[:, None] + positions, 6)
+    incodes = numpy.take_along_axis(chars, indices, axis=1)
+    incodes = numpy.where(positions < (incode_end - outcode_end)[:, None], incodes, 0)
+
+    outcodes = numpy.ascontiguousarray(outcodes, dtype=dtype)
+    incodes = numpy.ascontiguousarray(incodes, dtype=dtype)
+    return (outcodes.view('{}4'.format(kind))[:, 0],
+            incodes.view('{}3'.format(kind))[:, 0])
+
+
+def parse_codes(codes, strict=True, incode_mandatory=True, decode=None):
+    '''Parse postcodes held as a two dimensional array of character codes.
+
+    The building block of parse_array, for callers that already hold
+    postcodes as one row of zero padded character codes each.
+
+    Arguments:
+    codes               Array of shape (rows, width) of unsigned integers.
+    strict              As for parse_uk_postcode.
+    incode_mandatory    As for parse_uk_postcode.
+    decode              Function returning the row at an index as a str.
+                        Rows containing non-ASCII characters, and rows
+                        wider than MAX_WIDTH with no more than seven other
+                        characters in their first MAX_WIDTH, are passed
+                        through it and parsed one at a time, so that the
+                        results match parse_uk_postcode exactly. Without
+                        it, such rows are decoded as ASCII, and reported
+                        invalid if they are not.
+
+    Returns:            normalised, valid, outcode_end, incode_end, status -
+                        as for ParsedArray, except that normalised is an array of
+                        shape (rows, 7) of uint32 character codes.
+    '''
+
+    _require_numpy()
+    rows = len(codes)
+    normalised = numpy.zeros((rows, 7), dtype=numpy.uint32)
+    valid = numpy.zeros(rows, dtype=bool)
+    outcode_end = numpy.zeros(rows, dtype=numpy.int8)
+    incode_end = numpy.zeros(rows, dtype=numpy.int8)
+    status = numpy.full(rows, ResultCode.INVALID, dtype=numpy.int8)
+    if not rows:
+        return normalised, valid, outcode_end, incode_end, status
+
+    # Normalise - drop whitespace and padding, then upper case. A column at
+    # a time, so that no temporary is larger than one value per row.
+    width = codes.shape[1]
+    lengths = numpy.zeros(rows, dtype=numpy.uint8)
+    non_ascii = numpy.zeros(rows, dtype=bool)
+    for column in range(min(width, MAX_WIDTH)):
+        chars = codes[:, column]
+        keep = (chars != 0) & ~numpy.isin(chars, WHITESPACE_CODES)
+        non_ascii |= chars >= 128
+        fits = keep & (lengths < 7)
+        normalised[fits, lengths[fits]] = chars[fits]
+        lengths += keep
+    # Rows wider than MAX_WIDTH are too long unless mostly whitespace, which
+    # only parsing the whole row can tell
+    wide = codes[:, MAX_WIDTH] != 0 if width > MAX_WIDTH else numpy.zeros(rows, dtype=bool)
+    one_at_a_time = non_ascii | (wide & (lengths <= 7))
+    lower = (normalised >= 97) & (normalised <= 122)
+    normalised[lower] -= 32
+
+    in_range = (lengths <= 7) & ~one_at_a_time
+    if strict:
+        outcode, full = _match_strict(normalised, lengths)
+        matched = in_range & (outcode > 0)
+    else:
+        full = lengths > 4
+        outcode = numpy.where(full, lengths - 3, lengths)
+        matched = in_range
+    full &= in_range
+
+    valid[:] = full if incode_mandatory else matched
+    outcode_end[valid] = outcode[valid]
+    incode_end[valid] = outcode[valid] + 3 * full[valid]
+
+    status[valid] = ResultCode.VALID
+    if incode_mandatory:
+        status[matched & ~full] = ResultCode.INCODE_NOT_FOUND
+    status[lengths > 7] = ResultCode.MAX_LENGTH_EXCEEDED
+
+    normalised[lengths > 7] = 0
+    if decode is None:
+        decode = _ascii_decoder(codes)
+    for row in numpy.nonzero(one_at_a_time)[0]:
+        _parse_row(row, decode, strict, incode_mandatory,
+                   normalised, valid, outcode_end, incode_end, status)
+
+    return normalised, valid, outcode_end, incode_end, status
+
+
+def _match_strict(normalised, lengths):
+    '''Vectorised counterpart of parser.match_strict.
+
+    Returns the outcode length of each row, zero where there is no match,
+    and a mask of rows where a full postcode matched.
+    '''
+
+    tables = _tables()
+    chars = numpy.minimum(normalised, 127)
+    first, second, third, fourth = (chars[:, i] for i in range(4))
+    digit = tables['digit']
+
+    one_char = tables['one_char'][first] & digit[second]
+    two_char = ~one_char & tables['two_char'][first, second] & digit[third]
+    forces = (first == ord('B')) & (second == ord('F')) & (third == ord('1'))
+    forces &= ~one_char & ~two_char
+
+    shortest = numpy.where(one_char, 2, numpy.where(two_char | forces, 3, 0))
+    extra = (one_char & tables['third'][third]) | (two_char & tables['fourth'][fourth])
+    longest = shortest + extra
+
+    # incode[i] is true where a valid incode starts at position i
+    incode = numpy.zeros((len(chars), 5), dtype=bool)
+    for start in range(2, 5):
+        incode[:, start] = (digit[chars[:, start]] &
+                            tables['incode'][chars[:, start + 1]] &
+                            tables['incode'][chars[:, start + 2]])
+    rows = numpy.arange(len(chars))
+    long_full = extra & incode[rows, longest]
+    short_full = (shortest > 0) & incode[rows, shortest]
+    full = long_full | short_full
+
+    outcode = numpy.where(long_full, longest, numpy.where(short_full, shortest, 0))
+    standalone = ~full & (shortest > 0)
+    outcode = numpy.where(standalone & (lengths == longest), longest, outcode)
+    outcode = numpy.where(standalone & (lengths == shortest), shortest, outcode)
+
+    # Try Girobank special case
+    girobank = (first == ord('G')) & (second == ord('I')) & (third == ord('R'))
+    girobank_full = girobank & (lengths == 6) & (chars[:, 3] == ord('0')) & \
+        (chars[:, 4] == ord('A')) & (chars[:, 5] == ord('A'))
+    girobank_outcode = girobank & (lengths == 3)
+    outcode = numpy.where(girobank_full | girobank_outcode, 3, outcode)
+    full |= girobank_full
+
+    return outcode, full
+
+
+def _parse_row(row, decode, strict, incode_mandatory,
+               normalised, valid, outcode_end, incode_end, status):
+    '''Parse a single row with parse_uk_postcode's core and store it.'''
+
+    normalised[row] = 0
+    valid[row] = False
+    outcode_end[row] = incode_end[row] = 0
+    postcode = decode(row)
+    if postcode is None:
+        status[row] = ResultCode.INVALID
+        return
+    outcode, incode, error = parser._parse(postcode, strict, incode_mandatory)
+    status[row] = ResultCode.for_error(error)
+    if error is not None:
+        return
+    postcode = outcode + incode
+    normalised[row, :len(postcode)] = [ord(char) for char in postcode]
+    valid[row] = True
+    outcode_end[row] = len(outcode)
+    incode_end[row] = len(postcode)
+
+
+def _as_codes(array):
+    '''View a fixed width string array as a 2D array of character codes.'''
+
+    array = numpy.ascontiguousarray(array)
+    if array.dtype.kind == 'S':
+        dtype, width = numpy.uint8, array.itemsize
+    else:
+        dtype, width = numpy.uint32, array.itemsize // 4
+    return array.view(dtype).reshape(len(array), width)
+
+
+def _decoder(array):
+    '''Return a function decoding a row of array to str.'''
+
+    if array.dtype.kind == 'S':
+        return lambda row: array[row].decode('utf-8', 'replace')
+    return lambda row: str(array[row])
+
+
+def _ascii_decoder(codes):
+    '''Return a function decoding a row of codes to str, or None if not ASCII.'''
+
+    def decode(row):
+        chars = codes[row]
+        chars = chars[chars != 0]
+        if (chars >= 128).any():
+            return None
+        return chars.astype(numpy.uint8).tobytes().decode('ascii')
+    return decode
+
+
+def _from_objects(array):
+    '''Convert an object array to a string array, a mask of non-strings, and
+    a function returning the str at a row.
+
+    Values longer than MAX_WIDTH are left out of the string array, so that
+    one long value does not widen every row, and are parsed from the str.
+    '''
+
+    kinds = numpy.frompyfunc(type, 1, 1)(array)
+    is_bytes = kinds == bytes
+    missing = ~is_bytes & (kinds != str)
+    for index in numpy.nonzero(missing)[0]:
+        # Subclasses of str and bytes are rare enough to check one by one
+        is_bytes[index] = isinstance(array[index], bytes)
+        missing[index] = not is_bytes[index] and not isinstance(array[index], str)
+
+    values = array.copy()
+    values[missing] = ''
+    if is_bytes.any():
+        values[is_bytes] = [
+            value.decode('utf-8', 'replace') for value in values[is_bytes]
+        ]
+    strings = values.copy()
+    # A non-ASCII character sends the row to be parsed from values
+    strings[numpy.frompyfunc(len, 1, 1)(values) > MAX_WIDTH] = '\x80'
+    strings = strings.astype('U') if len(values) else numpy.zeros(0, 'U1')
+    return strings, missing, values.__getitem__
+
+
+_TABLES = {}
+
+
+def _tables():
+    '''Build, once, lookup tables for character classes indexed by code.'''
+
+    if not _TABLES:
+        def table(chars):
+            result = numpy.zeros(128, dtype=bool)
+            result[[ord(char) for char in chars]] = True
+            return result
+
+        two_char = numpy.zeros((128, 128), dtype=bool)
+        for zone in parser.POSTAL_ZONES_TWO_CHARS:
+            two_char[ord(zone[0]), ord(zone[1])] = True
+
+        _TABLES.update(
+            digit=table(parser.DIGITS),
+            one_char=table(parser.POSTAL_ZONES_ONE_CHAR),
+            two_char=two_char,
+            third=table(parser.THIRD_POS_CLASS),
+            fourth=table(parser.FOURTH_POS_CLASS),
+            incode=table(parser.INCODE_CHARS),
+        )
+    return _TABLES
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError('NumPy is required for vectorised postcode parsing')